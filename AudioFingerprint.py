@@ -0,0 +1,330 @@
+from ProjectStore import read_interval_csv, format_time, first_video
+import numpy as np
+import subprocess
+import shutil
+import wave
+import time
+import csv
+import os
+
+# PCM the fingerprints are computed on: mono, 8 kHz is enough for speech/music peaks
+SAMPLE_RATE = 8000
+FFT_SIZE = 1024
+HOP = 256                      # one spectrogram frame every 32 ms
+
+# spectral peaks: local maxima over +-PEAK_TIME frames and +-PEAK_FREQ bins,
+# only the PEAK_DENSITY strongest ones per second, so noise adds few peaks
+PEAK_TIME = 8
+PEAK_FREQ = 12
+PEAK_DENSITY = 10
+
+# each peak is paired with up to FAN_OUT later peaks at most MAX_DT frames ahead
+FAN_OUT = 5
+MAX_DT = 63
+
+# frames of spectrogram computed at once, keeps long films in bounded memory
+BLOCK = 4096
+
+# hashes seen more often than this in the game video say nothing, skipped
+MAX_HITS = 50
+
+# fewest agreeing hashes for a suggested pair
+MIN_VOTES = 10
+
+
+def frame_seconds(frames):
+    return np.asarray(frames) * HOP / SAMPLE_RATE
+
+
+# -----------------------------------------------------------
+# PCM
+# -----------------------------------------------------------
+def decode_pcm(path, rate=SAMPLE_RATE):
+    """Mono int16 samples of a file's audio at the given rate. WAV files are
+    read directly, anything else goes through the ffmpeg command line tool
+    (ffpyplayer only plays audio, it does not hand out samples)."""
+    if path.lower().endswith(".wav"):
+        return read_wav(path, rate)
+
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg bulunamadı, audio decode edilemiyor: " + path)
+
+    proc = subprocess.run(
+        [ffmpeg, "-v", "quiet", "-i", path, "-vn", "-ac", "1", "-ar", str(rate), "-f", "s16le", "-"],
+        stdout=subprocess.PIPE, check=True
+    )
+    return np.frombuffer(proc.stdout, np.int16)
+
+
+def read_wav(path, rate=SAMPLE_RATE):
+    with wave.open(path, "rb") as w:
+        if w.getsampwidth() != 2:
+            raise ValueError("only 16-bit WAV files are supported: " + path)
+        channels = w.getnchannels()
+        src_rate = w.getframerate()
+        pcm = np.frombuffer(w.readframes(w.getnframes()), np.int16)
+
+    if channels > 1:
+        pcm = pcm.reshape(-1, channels).mean(axis=1)
+    if src_rate != rate:
+        # linear resampling is fine for peak positions
+        n = int(len(pcm) * rate / src_rate)
+        pcm = np.interp(np.arange(n) * src_rate / rate, np.arange(len(pcm)), pcm)
+    return np.asarray(pcm, np.int16)
+
+
+# -----------------------------------------------------------
+# Fingerprinting
+# -----------------------------------------------------------
+WINDOW = np.hanning(FFT_SIZE).astype(np.float32)
+
+
+def spectrogram(pcm, first, count):
+    # log magnitudes of frames [first, first + count), shape (frames, bins)
+    start = first * HOP
+    samples = pcm[start:start + (count - 1) * HOP + FFT_SIZE].astype(np.float32)
+    if len(samples) < FFT_SIZE:
+        return np.zeros((0, FFT_SIZE // 2 + 1), np.float32)
+    frames = np.lib.stride_tricks.sliding_window_view(samples, FFT_SIZE)[::HOP]
+    return np.log1p(np.abs(np.fft.rfft(frames * WINDOW, axis=1))).astype(np.float32)
+
+
+def max_filter(a, size, axis):
+    # running maximum over +-size along one axis
+    pad = [(0, 0)] * a.ndim
+    pad[axis] = (size, size)
+    padded = np.pad(a, pad, constant_values=-np.inf)
+    return np.lib.stride_tricks.sliding_window_view(padded, 2 * size + 1, axis=axis).max(axis=-1)
+
+
+def find_peaks(spec):
+    # (frame, bin) of the strongest local maxima, sorted by frame
+    local = max_filter(max_filter(spec, PEAK_TIME, 0), PEAK_FREQ, 1)
+    floor = spec.mean()
+    t, f = np.nonzero((spec == local) & (spec > floor))
+
+    # rank the peaks inside each second by magnitude
+    second = t // int(round(SAMPLE_RATE / HOP))
+    order = np.lexsort((-spec[t, f], second))
+    t, f, second = t[order], f[order], second[order]
+    first = np.searchsorted(second, second, "left")
+    keep = np.arange(len(t)) - first < PEAK_DENSITY
+
+    t, f = t[keep], f[keep]
+    order = np.lexsort((f, t))
+    return t[order], f[order]
+
+
+def pair_hashes(t, f):
+    """Combinatorial hashes of peak pairs: (f1, f2, dt) packed in 26 bits,
+    with the anchor's frame. Peaks must be sorted by frame."""
+    hashes, times = [], []
+    for k in range(1, FAN_OUT + 1):
+        # the k-th next peak of every anchor, vectorized per k
+        dt = t[k:] - t[:-k]
+        ok = (dt > 0) & (dt <= MAX_DT)
+        f1, f2 = f[:-k][ok], f[k:][ok]
+        hashes.append((f1.astype(np.uint32) << 16) | (f2.astype(np.uint32) << 6) | dt[ok].astype(np.uint32))
+        times.append(t[:-k][ok])
+    if not hashes:
+        return np.zeros(0, np.uint32), np.zeros(0, np.int32)
+    return np.concatenate(hashes), np.concatenate(times).astype(np.int32)
+
+
+def fingerprint(pcm):
+    """Hashes and anchor frames of a whole track, sorted by frame. The
+    spectrogram is computed BLOCK frames at a time, overlapping enough that
+    no peak pair across a block border is lost."""
+    total = max(0, (len(pcm) - FFT_SIZE) // HOP + 1)
+    margin = PEAK_TIME + MAX_DT
+    all_hashes, all_times = [], []
+
+    for first in range(0, total, BLOCK):
+        lo = max(0, first - PEAK_TIME)
+        hi = min(total, first + BLOCK + margin)
+        spec = spectrogram(pcm, lo, hi - lo)
+        t, f = find_peaks(spec)
+        hashes, times = pair_hashes(t + lo, f)
+
+        # every anchor belongs to exactly one block
+        keep = (times >= first) & (times < first + BLOCK)
+        all_hashes.append(hashes[keep])
+        all_times.append(times[keep])
+
+    if not all_hashes:
+        return np.zeros(0, np.uint32), np.zeros(0, np.int32)
+    hashes = np.concatenate(all_hashes)
+    times = np.concatenate(all_times)
+    order = np.argsort(times, kind="stable")
+    return hashes[order], times[order]
+
+
+# -----------------------------------------------------------
+# Audio Fingerprints
+# -----------------------------------------------------------
+class AudioFingerprints:
+    """Spectral-peak hashes of a video's audio track, kept in a
+    '<video>.afp' sidecar (invalidated by the video's mtime/size)."""
+    def __init__(self, hashes, times):
+        self.hashes = np.asarray(hashes, np.uint32)
+        self.times = np.asarray(times, np.int32)
+        self._sorted = None
+
+    @staticmethod
+    def sidecar(video_path):
+        return video_path + ".afp"
+
+    @classmethod
+    def build(cls, video_path):
+        fp = cls(*fingerprint(decode_pcm(video_path)))
+        fp.save(video_path)
+        return fp
+
+    @classmethod
+    def load(cls, video_path):
+        path = cls.sidecar(video_path)
+        if not os.path.exists(path):
+            return None
+        try:
+            st = os.stat(video_path)
+            with np.load(path) as data:
+                params = (SAMPLE_RATE, FFT_SIZE, HOP, PEAK_TIME, PEAK_FREQ, PEAK_DENSITY, FAN_OUT, MAX_DT)
+                if tuple(data["stat"]) != (st.st_mtime_ns, st.st_size) or tuple(data["params"]) != params:
+                    return None
+                return cls(data["hashes"], data["times"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, video_path):
+        st = os.stat(video_path)
+        path = self.sidecar(video_path)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                stat=np.array([st.st_mtime_ns, st.st_size], np.int64),
+                params=np.array([SAMPLE_RATE, FFT_SIZE, HOP, PEAK_TIME, PEAK_FREQ, PEAK_DENSITY, FAN_OUT, MAX_DT], np.int64),
+                hashes=self.hashes,
+                times=self.times
+            )
+        os.replace(tmp_path, path)
+
+    def interval(self, start, end):
+        # hashes and anchor frames inside [start, end) seconds
+        lo, hi = np.searchsorted(self.times, [start * SAMPLE_RATE / HOP, end * SAMPLE_RATE / HOP])
+        return self.hashes[lo:hi], self.times[lo:hi]
+
+    def lookup(self, hashes):
+        """For each query hash every frame it occurs at: (query positions,
+        frames). Hashes that occur more than MAX_HITS times are skipped."""
+        if self._sorted is None:
+            order = np.argsort(self.hashes, kind="stable")
+            self._sorted = (self.hashes[order], self.times[order])
+        keys, frames = self._sorted
+
+        lo = np.searchsorted(keys, hashes, "left")
+        hi = np.searchsorted(keys, hashes, "right")
+        counts = hi - lo
+        counts[counts > MAX_HITS] = 0
+
+        total = int(counts.sum())
+        query = np.repeat(np.arange(len(hashes)), counts)
+        # lo[q], lo[q] + 1, ... for every query position q
+        starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+        return query, frames[starts + np.arange(total)]
+
+
+def match_interval(film_fp, film_bounds, game_fp, game_bounds, k=5, min_votes=MIN_VOTES):
+    """Game intervals that share the audio of one film interval:
+    [(game idx, votes, offset seconds), ...], most votes first. Every hash
+    found in both votes for (game interval, time offset); the offset is
+    where the film interval's start lies inside the game interval."""
+    fs, fe = film_bounds
+    hashes, film_t = film_fp.interval(fs, fe)
+    if len(hashes) == 0 or len(game_bounds) == 0:
+        return []
+
+    query, game_t = game_fp.lookup(hashes)
+    if len(game_t) == 0:
+        return []
+
+    # game interval of each hit (intervals sorted by start)
+    starts = np.asarray([b[0] for b in game_bounds]) * SAMPLE_RATE / HOP
+    ends = np.asarray([b[1] for b in game_bounds]) * SAMPLE_RATE / HOP
+    gi = np.searchsorted(starts, game_t, "right") - 1
+    ok = (gi >= 0) & (game_t < ends[np.maximum(gi, 0)])
+    gi, game_t, film_t = gi[ok], game_t[ok], film_t[query[ok]]
+    if len(gi) == 0:
+        return []
+
+    # votes per (game interval, absolute frame offset)
+    offset = game_t.astype(np.int64) - film_t
+    span = int(offset.max() - offset.min()) + 1
+    keys, votes = np.unique(gi * span + (offset - offset.min()), return_counts=True)
+    pair_gi = keys // span
+    pair_off = keys % span + offset.min()
+
+    # best offset per game interval
+    order = np.lexsort((-votes, pair_gi))
+    first = np.ones(len(order), bool)
+    first[1:] = pair_gi[order][1:] != pair_gi[order][:-1]
+    best = order[first]
+    best = best[votes[best] >= min_votes]
+    best = best[np.argsort(-votes[best], kind="stable")][:k]
+
+    result = []
+    for i in best:
+        g = int(pair_gi[i])
+        # film start mapped into the game video, relative to the game interval
+        offset_sec = float(frame_seconds(pair_off[i])) + fs - game_bounds[g][0]
+        result.append((g, int(votes[i]), offset_sec))
+    return result
+
+
+def write_suggestions(path, film_bounds, game_bounds, film_fp, game_fp):
+    # film interval, best game interval, votes and offset for every film interval that has one
+    rows = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["film_start", "film_end", "game_start", "game_end", "votes", "offset"])
+        for fb in film_bounds:
+            found = match_interval(film_fp, fb, game_fp, game_bounds, k=1)
+            if found:
+                g, votes, offset = found[0]
+                gb = game_bounds[g]
+                writer.writerow([format_time(fb[0]), format_time(fb[1]), format_time(gb[0]), format_time(gb[1]),
+                                 votes, f"{offset:.2f}"])
+                rows += 1
+    return rows
+
+
+def load_or_build(video_path):
+    fp = AudioFingerprints.load(video_path)
+    if fp is None:
+        fp = AudioFingerprints.build(video_path)
+    return fp
+
+
+if __name__ == "__main__":
+    # python AudioFingerprint.py  -> control_*/reference_* fingerprints and audio_suggestions.csv
+    videos = {}
+    for prefix in ["control_", "reference_"]:
+        found = first_video(".", prefix)
+        if not found:
+            raise FileNotFoundError(f"{prefix} videosu bulunamadı.")
+        videos[prefix] = os.path.normpath(found)
+
+    fps = {}
+    for prefix, video in videos.items():
+        t0 = time.time()
+        fps[prefix] = load_or_build(video)
+        print(f"{video}: {len(fps[prefix].hashes)} hashes, {time.time() - t0:.1f}s")
+
+    if os.path.exists("film.csv") and os.path.exists("game.csv"):
+        rows = write_suggestions(
+            "audio_suggestions.csv",
+            read_interval_csv("film.csv"), read_interval_csv("game.csv"),
+            fps["control_"], fps["reference_"]
+        )
+        print(f"audio_suggestions.csv: {rows} suggested pairs")
@@ -0,0 +1,221 @@
+from ffpyplayer.player import MediaPlayer
+from ProjectStore import read_interval_csv, find_pairs
+from ShotDetector import detect_shots, write_intervals
+from KeyframeIndex import KeyframeIndex
+from ThumbnailCache import ThumbnailCache, build_thumbnails
+from SimilarityIndex import build_hashes
+from AudioFingerprint import load_or_build, write_suggestions
+from multiprocessing import Pool
+import argparse
+import json
+import time
+import os
+
+# per-pair progress, written beside the videos after every stage
+STATUS_FILE = "batch_status.json"
+
+# stages in the order they run; "audio" needs ffmpeg and is not run by default
+STAGES = ["probe", "detect", "keyframes", "thumbnails", "similarity", "audio"]
+DEFAULT_STAGES = ["probe", "detect", "keyframes", "thumbnails", "similarity"]
+
+
+# -----------------------------------------------------------
+# Status
+# -----------------------------------------------------------
+def video_stat(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def load_status(directory, videos):
+    # stages done for these exact videos; a replaced video starts over
+    path = os.path.join(directory, STATUS_FILE)
+    stats = {os.path.basename(v): video_stat(v) for v in videos}
+    try:
+        with open(path, encoding="utf-8") as f:
+            status = json.load(f)
+        if isinstance(status, dict) and status.get("videos") == stats and isinstance(status.get("stages"), dict):
+            return status
+    except (OSError, ValueError):
+        pass
+    return {"videos": stats, "stages": {}}
+
+
+def save_status(directory, status):
+    path = os.path.join(directory, STATUS_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(status, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+# -----------------------------------------------------------
+# Stages (run inside the worker processes)
+# -----------------------------------------------------------
+def probe_video(path, timeout=10.0):
+    player = MediaPlayer(path.encode('utf-8'), ff_opts={'paused': 1, 'an': 1}, loglevel="quiet")
+    try:
+        t0 = time.time()
+        meta = player.get_metadata()
+        while not (meta.get("src_vid_size") or (0, 0))[0] or not meta.get("duration"):
+            if time.time() - t0 > timeout:
+                raise RuntimeError("Video açılamadı: " + path)
+            time.sleep(0.005)
+            meta = player.get_metadata()
+        return {
+            "duration": meta["duration"],
+            "size": list(meta["src_vid_size"]),
+            "frame_rate": list(meta.get("frame_rate") or ()),
+        }
+    finally:
+        player.close_player()
+
+
+def stage_probe(directory, control, reference):
+    return {os.path.basename(v): probe_video(v) for v in (control, reference)}
+
+
+def stage_detect(directory, control, reference):
+    result = {}
+    for video, name in ((control, "film.csv"), (reference, "game.csv")):
+        csv_path = os.path.join(directory, name)
+        if os.path.exists(csv_path):
+            # hand-made or earlier intervals are kept
+            result[name] = "kept"
+            continue
+        intervals = detect_shots(video, workers=1)
+        write_intervals(csv_path, intervals)
+        result[name] = len(intervals)
+    return result
+
+
+def stage_keyframes(directory, control, reference):
+    result = {}
+    for video in (control, reference):
+        index = KeyframeIndex(video)
+        if not index.times:
+            index.scan()
+        result[os.path.basename(video)] = len(index.times)
+    return result
+
+
+def interval_jobs(directory, control, reference):
+    # (video, intervals) of both sides, the CSVs must exist by now
+    jobs = []
+    for video, name in ((control, "film.csv"), (reference, "game.csv")):
+        csv_path = os.path.join(directory, name)
+        if not os.path.exists(csv_path):
+            raise FileNotFoundError(csv_path + " yok (detect stage)")
+        jobs.append((video, read_interval_csv(csv_path)))
+    return jobs
+
+
+def stage_thumbnails(directory, control, reference):
+    result = {}
+    for video, intervals in interval_jobs(directory, control, reference):
+        cache = ThumbnailCache(video, intervals)
+        try:
+            build_thumbnails(cache)
+            result[os.path.basename(video)] = len(intervals) - len(cache.missing())
+        finally:
+            cache.close()
+    return result
+
+
+def stage_similarity(directory, control, reference):
+    result = {}
+    for video, intervals in interval_jobs(directory, control, reference):
+        index = build_hashes(video, intervals)
+        result[os.path.basename(video)] = int(index.valid.sum())
+    return result
+
+
+def stage_audio(directory, control, reference):
+    film_fp = load_or_build(control)
+    game_fp = load_or_build(reference)
+    (_, film_bounds), (_, game_bounds) = interval_jobs(directory, control, reference)
+    rows = write_suggestions(os.path.join(directory, "audio_suggestions.csv"), film_bounds, game_bounds, film_fp, game_fp)
+    return {"suggestions": rows}
+
+
+STAGE_FUNCS = {
+    "probe": stage_probe,
+    "detect": stage_detect,
+    "keyframes": stage_keyframes,
+    "thumbnails": stage_thumbnails,
+    "similarity": stage_similarity,
+    "audio": stage_audio,
+}
+
+
+def process_pair(args):
+    """Run the stages of one pair that are not done yet. A failing stage is
+    recorded and ends the pair; the next run retries from there. A status
+    file that can't be read or written fails the pair as "status", the
+    other pairs go on."""
+    (directory, control, reference), stages, force = args
+    ran, failed = [], None
+    try:
+        status = load_status(directory, [control, reference])
+    except Exception as e:
+        return directory, ran, "status", f"{type(e).__name__}: {e}"
+
+    for stage in stages:
+        done = status["stages"].get(stage, {})
+        if done.get("ok") and not force:
+            continue
+
+        t0 = time.time()
+        try:
+            result = STAGE_FUNCS[stage](directory, control, reference)
+            status["stages"][stage] = {"ok": True, "seconds": round(time.time() - t0, 2), "result": result}
+        except Exception as e:
+            status["stages"][stage] = {"ok": False, "seconds": round(time.time() - t0, 2), "error": f"{type(e).__name__}: {e}"}
+            failed = stage
+        status["updated"] = time.strftime("%Y-%m-%d %H:%M:%S")
+        ran.append(stage)
+        try:
+            save_status(directory, status)
+        except Exception as e:
+            return directory, ran, "status", f"{type(e).__name__}: {e}"
+        if failed:
+            break
+
+    return directory, ran, failed, None
+
+
+if __name__ == "__main__":
+    # python BatchProcess.py ROOT [-j 4] [--stages probe,detect,...]
+    parser = argparse.ArgumentParser(description="Run the analysis stages for every control/reference pair under a root.")
+    parser.add_argument("root", nargs="?", default=".", help="directory searched for pairs (default: here)")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1, help="pairs processed at once")
+    parser.add_argument("--stages", default=",".join(DEFAULT_STAGES), help="comma separated, from: " + ",".join(STAGES))
+    parser.add_argument("-f", "--force", action="store_true", help="run the stages again even if done")
+    args = parser.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGE_FUNCS]
+    if unknown:
+        parser.error("unknown stage: " + ", ".join(unknown))
+    stages = [s for s in STAGES if s in stages]
+
+    pairs = find_pairs(args.root)
+    print(f"{len(pairs)} pairs, stages: {', '.join(stages)}")
+
+    t0 = time.time()
+    jobs = [(pair, stages, args.force) for pair in pairs]
+    failures = 0
+    with Pool(max(1, min(args.workers, len(jobs) or 1))) as pool:
+        for directory, ran, failed, error in pool.imap_unordered(process_pair, jobs):
+            if error:
+                failures += 1
+                print(f"{directory}: {STATUS_FILE} failed: {error}")
+            elif failed:
+                failures += 1
+                print(f"{directory}: {failed} failed (see {STATUS_FILE})")
+            elif ran:
+                print(f"{directory}: {', '.join(ran)}")
+            else:
+                print(f"{directory}: up to date")
+
+    print(f"done in {time.time() - t0:.1f}s, {failures} failed")
@@ -0,0 +1,382 @@
+import os
+
+# headless: no window and no sound device needed
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from ffpyplayer.writer import MediaWriter
+from ffpyplayer.pic import Image
+from ProjectStore import format_time
+from IntervalMatchingApp import VideoApp, VideoPanel, ScrollList, MatchIndex
+import numpy as np
+import subprocess
+import platform
+import argparse
+import tempfile
+import shutil
+import json
+import time
+import csv
+import sys
+
+DEFAULT_ROWS = [10, 1000, 100000, 1000000]
+RESULTS_FILE = "benchmark.json"
+
+# a change of the mean above this ratio is reported by --compare
+REGRESSION_RATIO = 1.2
+
+
+# -----------------------------------------------------------
+# Synthetic Media
+# -----------------------------------------------------------
+def make_video(path, seconds=10, size=(640, 360), fps=25, seed=0):
+    """Moving noise blocks with a cut every 2 seconds, mpeg4 encoded
+    through ffpyplayer's MediaWriter (no ffmpeg binary needed)."""
+    if os.path.exists(path):
+        os.remove(path)    # MediaWriter does not overwrite
+    w, h = size
+    out = [{
+        'pix_fmt_in': 'rgb24', 'width_in': w, 'height_in': h,
+        'codec': 'mpeg4', 'pix_fmt_out': 'yuv420p', 'frame_rate': (fps, 1)
+    }]
+    writer = MediaWriter(path, out)
+    rng = np.random.default_rng(seed)
+    block = 16
+    try:
+        for i in range(int(seconds * fps)):
+            if i % (2 * fps) == 0:
+                base = rng.integers(0, 256, (h // block + 1, w // block + 1, 3)).astype(np.uint8)
+                base = np.kron(base, np.ones((block, block, 1), np.uint8))[:h, :w]
+            frame = np.ascontiguousarray(np.roll(base, i * 4, axis=1))
+            img = Image(plane_buffers=[frame.tobytes()], pix_fmt='rgb24', size=(w, h))
+            writer.write_frame(img=img, pts=i / fps, stream=0)
+    finally:
+        writer.close()
+
+
+def make_intervals_csv(path, rows, length=2):
+    # back to back intervals of `length` seconds
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["start", "end"])
+        for i in range(rows):
+            writer.writerow([format_time(i * length), format_time((i + 1) * length)])
+
+
+def make_matches_csv(path, rows, film_rows, game_rows, length=2):
+    # every row resolves to a film and a game interval of make_intervals_csv
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["film_start", "film_end", "game_start", "game_end"])
+        for i in range(rows):
+            film = i % film_rows
+            game = (i * 7) % game_rows
+            writer.writerow([
+                format_time(film * length), format_time((film + 1) * length),
+                format_time(game * length), format_time((game + 1) * length)
+            ])
+
+
+# -----------------------------------------------------------
+# Timing
+# -----------------------------------------------------------
+def stats(samples):
+    # seconds per call -> summary in milliseconds
+    arr = np.asarray(samples, np.float64) * 1000
+    if not len(arr):
+        return {"calls": 0}
+    return {
+        "calls": int(len(arr)),
+        "mean_ms": round(float(arr.mean()), 4),
+        "p50_ms": round(float(np.percentile(arr, 50)), 4),
+        "p95_ms": round(float(np.percentile(arr, 95)), 4),
+        "max_ms": round(float(arr.max()), 4),
+        "total_s": round(float(arr.sum()) / 1000, 4),
+    }
+
+
+def timed(fn, repeat=1, setup=None):
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def repeats(rows, budget=100000, limit=50):
+    # more runs for small inputs, one for the largest
+    return max(1, min(limit, budget // max(1, rows)))
+
+
+def scroll_positions(scroll_list, count=200):
+    # offsets spread over the whole list, top and bottom included
+    max_offset = max(0, len(scroll_list.items) * scroll_list.item_height - scroll_list.rect.h)
+    return sorted(set(int(x) for x in np.linspace(0, max_offset, count)))
+
+
+# -----------------------------------------------------------
+# Benchmarks
+# -----------------------------------------------------------
+def bench_panel(screen, video, seconds):
+    """VideoPanel.update/draw while the video plays, at the app's 30 fps."""
+    panel = VideoPanel(0, 0, screen.get_width() // 2, screen.get_height(), video, audio=False)
+    try:
+        t0 = time.time()
+        while (not panel.player or not panel.duration) and time.time() - t0 < 10:
+            time.sleep(0.005)
+        panel.toggle()
+
+        clock = pygame.time.Clock()
+        updates, draws, full_draws = [], [], []
+        frames = 0
+        last = None
+        t0 = time.time()
+        while time.time() - t0 < seconds:
+            pygame.event.pump()
+            t = time.perf_counter()
+            panel.update()
+            updates.append(time.perf_counter() - t)
+
+            t = time.perf_counter()
+            rects = panel.draw(screen)
+            draws.append(time.perf_counter() - t)
+            if rects:
+                pygame.display.update(rects)
+
+            if panel.frame is not last:
+                last = panel.frame
+                frames += 1
+            clock.tick(30)
+
+        for _ in range(100):
+            t = time.perf_counter()
+            panel.draw(screen, force=True)
+            full_draws.append(time.perf_counter() - t)
+    finally:
+        panel.close()
+
+    return {
+        "VideoPanel.update": stats(updates),
+        "VideoPanel.draw": dict(stats(draws), frames_shown=frames, seconds=seconds),
+        "VideoPanel.draw(force)": stats(full_draws),
+    }
+
+
+def bench_scroll_list(screen, app, items):
+    scroll_list = ScrollList(0, 0, 300, screen.get_height() - 70)
+    scroll_list.set_items(items)
+    scroll_list.draw(screen, app.small_font, app.left_panel.format_time, force=True)   # warm text cache
+    samples = []
+    for offset in scroll_positions(scroll_list):
+        scroll_list.scroll_offset = offset
+        t = time.perf_counter()
+        scroll_list.draw(screen, app.small_font, app.left_panel.format_time, force=True)
+        samples.append(time.perf_counter() - t)
+    return stats(samples)
+
+
+def bench_draw_scroll_list(app, items):
+    # the app's list drawing (highlights, candidates) without thumbnails
+    app.film_intervals = items
+    app.film_list.set_items(items)
+    app.film_thumbs = None
+    app.selected_film_idx = app.selected_game_idx = None
+    app.draw_scroll_list(app.film_list, None)   # warm text cache
+    samples = []
+    for offset in scroll_positions(app.film_list):
+        app.film_list.scroll_offset = offset
+        t = time.perf_counter()
+        app.draw_scroll_list(app.film_list, None)
+        samples.append(time.perf_counter() - t)
+    return stats(samples)
+
+
+def bench_matches(app, workdir, film_csv, game_csv, matches_csv, rows):
+    """load_matches_csv on `rows` matches, then append_match_csv and
+    remove_match_csv one match at a time (journal writes)."""
+    def reset():
+        app.film_intervals = app.load_csv(film_csv)
+        app.game_intervals = app.load_csv(game_csv)
+        for side in (app.film_intervals, app.game_intervals):
+            for i, it in enumerate(side):
+                it["id"] = i
+                it["matched"] = False
+        app.match_index = MatchIndex()
+        close_journals(app)
+
+    results = {}
+    results["load_matches_csv"] = stats(timed(lambda: app.load_matches_csv(matches_csv), repeats(rows, limit=10), reset))
+
+    # appends/removes go to a copy, its journal grows with every call
+    path = os.path.join(workdir, "matches_edit.csv")
+    shutil.copyfile(matches_csv, path)
+    if os.path.exists(path + ".journal"):
+        os.remove(path + ".journal")
+    calls = min(1000, len(app.film_intervals), len(app.game_intervals))
+    pairs = [(app.film_intervals[i], app.game_intervals[-1 - i]) for i in range(calls)]
+
+    appends, removes = [], []
+    for film_item, game_item in pairs:
+        t = time.perf_counter()
+        app.append_match_csv(film_item, game_item, path)
+        appends.append(time.perf_counter() - t)
+    for film_item, game_item in pairs:
+        t = time.perf_counter()
+        app.remove_match_csv(film_item, game_item, path)
+        removes.append(time.perf_counter() - t)
+    close_journals(app)
+
+    results["append_match_csv"] = stats(appends)
+    results["remove_match_csv"] = stats(removes)
+    return results
+
+
+def close_journals(app):
+    for journal in app.journals.values():
+        journal.close()
+    app.journals = {}
+
+
+# -----------------------------------------------------------
+# Results
+# -----------------------------------------------------------
+def git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, timeout=10
+        )
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(old, new):
+    # mean of every benchmark against an earlier results file
+    print(f"\n{old.get('commit')} -> {new.get('commit')}")
+    for name, entry in new["results"].items():
+        old_entry = old.get("results", {}).get(name)
+        if old_entry is None:
+            continue
+        cases = entry.items() if "calls" not in entry else [("", entry)]
+        for rows, result in cases:
+            before = old_entry.get(rows) if rows else old_entry
+            if not before or not before.get("mean_ms") or not result.get("mean_ms"):
+                continue
+            ratio = result["mean_ms"] / before["mean_ms"]
+            flag = "  <-- slower" if ratio > REGRESSION_RATIO else ""
+            label = f"{name} [{rows}]" if rows else name
+            print(f"  {label:40s} {before['mean_ms']:10.3f} -> {result['mean_ms']:10.3f} ms  x{ratio:.2f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless timings of the matching app on synthetic videos and CSVs.")
+    parser.add_argument("-o", "--output", default=RESULTS_FILE, help="results JSON (default: %(default)s)")
+    parser.add_argument("--rows", default=",".join(map(str, DEFAULT_ROWS)), help="CSV sizes, comma separated")
+    parser.add_argument("--video-seconds", type=float, default=10, help="length of the synthetic videos")
+    parser.add_argument("--video-size", default="640x360", help="WxH of the synthetic videos")
+    parser.add_argument("--play-seconds", type=float, default=5, help="how long the panel benchmark plays")
+    parser.add_argument("--workdir", help="keep the generated files here (default: a temporary directory)")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    rows_list = [int(r) for r in args.rows.split(",") if r.strip()]
+    size = tuple(int(v) for v in args.video_size.lower().split("x"))
+    workdir = args.workdir or tempfile.mkdtemp(prefix="benchmark_")
+    os.makedirs(workdir, exist_ok=True)
+
+    try:
+        # -----------------------------------------------
+        # Inputs
+        # -----------------------------------------------
+        t0 = time.time()
+        pair_dir = os.path.join(workdir, "pair")
+        os.makedirs(pair_dir, exist_ok=True)
+        control = os.path.join(pair_dir, "control_bench.mp4")
+        reference = os.path.join(pair_dir, "reference_bench.mp4")
+        make_video(control, args.video_seconds, size, seed=1)
+        make_video(reference, args.video_seconds, size, seed=2)
+        make_intervals_csv(os.path.join(pair_dir, "film.csv"), 10)
+        make_intervals_csv(os.path.join(pair_dir, "game.csv"), 10)
+
+        csvs = {}
+        for rows in rows_list:
+            film_csv = os.path.join(workdir, f"film_{rows}.csv")
+            game_csv = os.path.join(workdir, f"game_{rows}.csv")
+            matches_csv = os.path.join(workdir, f"matches_{rows}.csv")
+            make_intervals_csv(film_csv, rows)
+            make_intervals_csv(game_csv, rows)
+            make_matches_csv(matches_csv, rows, rows, rows)
+            csvs[rows] = (film_csv, game_csv, matches_csv)
+        print(f"inputs generated in {time.time() - t0:.1f}s ({workdir})")
+
+        # -----------------------------------------------
+        # Runs
+        # -----------------------------------------------
+        app = VideoApp(pair_dir)
+        app._loader.join()
+        screen = app.screen
+
+        results = bench_panel(screen, control, args.play_seconds)
+        print("VideoPanel: done")
+
+        for name in ("load_csv", "ScrollList.draw", "draw_scroll_list",
+                     "load_matches_csv", "append_match_csv", "remove_match_csv"):
+            results[name] = {}
+
+        for rows in rows_list:
+            film_csv, game_csv, matches_csv = csvs[rows]
+            t0 = time.time()
+            results["load_csv"][str(rows)] = stats(timed(lambda: app.load_csv(film_csv), repeats(rows)))
+
+            items = app.load_csv(film_csv)
+            for i, it in enumerate(items):
+                it["id"] = i
+                it["matched"] = False
+            results["ScrollList.draw"][str(rows)] = bench_scroll_list(screen, app, items)
+            results["draw_scroll_list"][str(rows)] = bench_draw_scroll_list(app, items)
+
+            for name, result in bench_matches(app, workdir, film_csv, game_csv, matches_csv, rows).items():
+                results[name][str(rows)] = result
+            print(f"{rows} rows: done in {time.time() - t0:.1f}s")
+
+        app.running = False
+        app.run()
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "commit": git_commit(),
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "pygame": pygame.version.ver,
+        "video": {"seconds": args.video_seconds, "size": list(size)},
+        "rows": rows_list,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print("results:", args.output)
+
+    for name, entry in results.items():
+        if "calls" in entry:
+            print(f"  {name:28s} mean {entry['mean_ms']:.3f} ms  p95 {entry['p95_ms']:.3f} ms")
+        else:
+            means = ", ".join(f"{rows}: {r['mean_ms']:.3f}" for rows, r in entry.items())
+            print(f"  {name:28s} mean ms  {means}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    # python Benchmark.py [-o benchmark.json] [--rows 10,1000] [--compare old.json]
+    main()
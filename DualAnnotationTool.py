@@ -1,12 +1,107 @@
 import pygame
 from ffpyplayer.player import MediaPlayer
-import glob
+from ProjectStore import ProjectStore, PROJECT_FILE, pair_name, first_video
+from collections import deque, OrderedDict
+import threading
+import time
 import csv
 import sys
 import os
 
 pygame.init()
 
+# -----------------------------------------------------------
+# Text Cache
+# -----------------------------------------------------------
+class TextCache:
+    """Loads every font once and keeps an LRU of rendered text surfaces
+    keyed by (text, color, font)."""
+    def __init__(self, max_items=1024):
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.max_items = max_items
+
+    def font(self, name, size):
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.SysFont(name, size)
+            self.fonts[key] = font
+        return font
+
+    def render(self, text, color, font):
+        key = (text, color, font)
+        surf = self.surfaces.get(key)
+        if surf is not None:
+            self.surfaces.move_to_end(key)
+            return surf
+
+        surf = font.render(text, True, color)
+        self.surfaces[key] = surf
+        if len(self.surfaces) > self.max_items:
+            self.surfaces.popitem(last=False)   # least recently used
+        return surf
+
+
+# shared by every widget
+text_cache = TextCache()
+
+
+# -----------------------------------------------------------
+# Frame Pacing
+# -----------------------------------------------------------
+# used when the display does not report its refresh rate
+DISPLAY_FPS = 60
+
+# the loop still runs this often without new frames, for input
+IDLE_FPS = 30
+
+# set by the decode threads whenever a frame is ready to be shown
+frame_ready = threading.Event()
+
+# idle mode: while both videos are paused the loop blocks on
+# pygame.event.wait, woken by input, by WAKE_EVENT from a decode thread
+# or by the timeout
+IDLE_TIMEOUT_MS = 500
+WAKE_EVENT = pygame.event.custom_type()
+idle_waiting = threading.Event()
+
+
+def notify_frame():
+    # decode thread side: a frame is ready for the main loop
+    frame_ready.set()
+    if idle_waiting.is_set():
+        idle_waiting.clear()
+        pygame.event.post(pygame.event.Event(WAKE_EVENT))
+
+
+class FramePacer:
+    """Decides when the main loop runs next: when a decode thread has a
+    frame due (get_frame's delay value), but not more often than the
+    display refreshes, and at least IDLE_FPS times a second."""
+    def __init__(self, refresh_rate=None, idle_fps=IDLE_FPS):
+        if not refresh_rate:
+            # pygame-ce only, plain pygame does not report the rate
+            get_rate = getattr(pygame.display, "get_current_refresh_rate", None)
+            refresh_rate = (get_rate() if get_rate else 0) or DISPLAY_FPS
+        self.refresh_rate = refresh_rate
+        self.min_interval = 1.0 / refresh_rate
+        self.max_interval = 1.0 / idle_fps
+        self._last = time.perf_counter()
+
+    def wait(self):
+        now = time.perf_counter()
+        deadline = self._last + self.max_interval
+        if deadline > now:
+            frame_ready.wait(deadline - now)
+
+        # a frame is shown at most once per display refresh
+        early = self._last + self.min_interval - time.perf_counter()
+        if early > 0:
+            time.sleep(early)
+        frame_ready.clear()
+        self._last = time.perf_counter()
+
 # -----------------------------------------------------------
 # Button Class
 # -----------------------------------------------------------
@@ -19,7 +114,7 @@ class Button:
 
     def draw(self, screen):
         pygame.draw.rect(screen, self.color, self.rect)
-        text_surf = self.font.render(self.text, True, (255, 255, 255))
+        text_surf = text_cache.render(self.text, (255, 255, 255), self.font)
         screen.blit(text_surf, (self.rect.x + 10, self.rect.y + (self.rect.h - text_surf.get_height()) // 2))
 
     def is_pressed(self, pos):
@@ -35,9 +130,15 @@ class ScrollList:
         self.items = []  # each item is a dict: {'start':, 'end':}
         self.scroll_offset = 0
         self.item_height = item_height
+        self._drawn_state = None
+
+        # formatted row texts, reset when a different items list is set
+        self._labels = {}     # (start, end, sep, formatter) -> text
 
     def set_items(self, items):
         """items: list of dicts with start,end"""
+        if items is not self.items:
+            self._labels = {}
         self.items = items
 
     def scroll(self, delta):
@@ -49,15 +150,53 @@ class ScrollList:
         visible = self.rect.h // self.item_height
         return start_idx, visible
 
-    def draw(self, surface, font, format_time_func):
+    def page(self, pages):
+        # keyboard paging, one page is the number of fully visible rows
+        visible = max(1, self.rect.h // self.item_height)
+        self.scroll(pages * visible * self.item_height)
+
+    def scroll_to_index(self, idx):
+        # put row idx at the top (clamped at the end of the list)
+        self.scroll_offset = 0
+        self.scroll(idx * self.item_height)
+
+    def index_at(self, pos):
+        """Row under pos, O(1) since every row has the same height."""
+        if not self.rect.collidepoint(pos):
+            return None
+
+        rel_y = pos[1] - self.rect.y + self.scroll_offset
+        idx = rel_y // self.item_height
+        if 0 <= idx < len(self.items):
+            return idx
+        return None
+
+    def row_text(self, i, format_time_func, sep="  -  "):
+        item = self.items[i]
+        key = (item["start"], item["end"], sep, format_time_func)
+        text = self._labels.get(key)
+        if text is None:
+            if len(self._labels) > 4096:
+                self._labels.clear()
+            text = f"{format_time_func(item['start'])}{sep}{format_time_func(item['end'])}"
+            self._labels[key] = text
+        return text
+
+    def draw(self, surface, font, format_time_func, force=False):
+        # skip when nothing visible changed, returns True if it was drawn
+        state = (self.scroll_offset, len(self.items), tuple(self.rect))
+        if not force and state == self._drawn_state:
+            return False
+        self._drawn_state = state
+
         pygame.draw.rect(surface, (40, 40, 40), self.rect)
         start_idx, visible = self.visible_range()
         for i in range(start_idx, min(len(self.items), start_idx + visible)):
-            item = self.items[i]
             y = self.rect.y + (i - start_idx) * self.item_height + 4
-            text = f"{format_time_func(item['start'])}  -  {format_time_func(item['end'])}"
-            t_surf = font.render(text, True, (200, 200, 200))
+            text = self.row_text(i, format_time_func)
+            t_surf = text_cache.render(text, (200, 200, 200), font)
             surface.blit(t_surf, (self.rect.x + 8, y))
+        return True
 
 
 # -----------------------------------------------------------
@@ -92,7 +231,22 @@ class ControlBar:
         self.play_rect = pygame.Rect(start_x + self.btn_w + spacing, btn_y, self.btn_w, self.btn_h)
         self.next_rect = pygame.Rect(start_x + (self.btn_w + spacing) * 2, btn_y, self.btn_w, self.btn_h)
 
+        # everything the bar paints (time text and buttons reach outside self.rect)
+        text_rect = pygame.Rect(bar_x, bar_y - 22, bar_w, 22)
+        self.area = self.rect.unionall([text_rect, self.back_rect, self.play_rect, self.next_rect])
+        self._drawn_state = None
+
+    def state(self, video_panel):
+        duration = video_panel.duration if video_panel.duration is not None else 0
+        current_sec = int(duration * self.progress) if duration else 0
+        fill_w = int(self.progress_rect.width * self.progress)
+        return fill_w, self.playing, current_sec, int(duration)
+
+    def changed(self, video_panel):
+        return self.state(video_panel) != self._drawn_state
+
     def draw(self, surface, video_panel):
+        self._drawn_state = self.state(video_panel)
         pygame.draw.rect(surface, (50, 50, 50), self.rect)
 
         # Progress bar
@@ -110,14 +264,14 @@ class ControlBar:
         pygame.draw.rect(surface, (0, 0, 200), self.next_rect)
 
         # --- Time text ---
-        font = pygame.font.SysFont(None, 22)
+        font = text_cache.font(None, 22)
 
         duration = video_panel.duration if video_panel.duration is not None else 0
         current_sec = duration * self.progress if duration else 0
         total_sec = duration
 
-        left_text = font.render(self.format_time(current_sec), True, (255, 255, 255))
-        right_text = font.render(self.format_time(total_sec), True, (255, 255, 255))
+        left_text = text_cache.render(self.format_time(current_sec), (255, 255, 255), font)
+        right_text = text_cache.render(self.format_time(total_sec), (255, 255, 255), font)
 
         surface.blit(left_text, (self.progress_rect.x, self.progress_rect.y - 22))
         surface.blit(right_text, (self.progress_rect.x + self.progress_rect.width - right_text.get_width(),
@@ -160,12 +314,27 @@ class ControlBar:
 # -----------------------------------------------------------
 # Video Panel Class
 # -----------------------------------------------------------
+# scaling of frames that do not come out of ffmpeg at the panel size
+# (in flight during a resize, or a player that ignores set_size):
+# "auto" scales fast while the video moves and redoes the shown frame
+# smoothly once it stands still, "smooth" and "fast" always use one way
+SCALE_QUALITIES = ("auto", "smooth", "fast")
+
+# a frame within this many seconds of a seek still counts as scrubbing
+SETTLE_TIME = 0.25
+
 class VideoPanel:
-    def __init__(self, x, y, w, h, video_path, audio=True, loop=False):
+    def __init__(self, x, y, w, h, video_path, audio=True, loop=False, scale_quality="auto"):
         # main pannel area
         self.rect = pygame.Rect(x, y, w, h)
         self.video_path = video_path
 
+        if scale_quality not in SCALE_QUALITIES:
+            raise ValueError("scale_quality: " + ", ".join(SCALE_QUALITIES))
+        self.scale_quality = scale_quality
+        self._scaled_fast = False   # shown frame waits for a smooth pass
+        self._last_seek = 0.0
+
         self.audio = audio
         self.loop = loop
         self.playing = False
@@ -192,31 +361,130 @@ class VideoPanel:
         self._vid_size = None
         self._scaled = None
         self._target = None
+        self._out_size = None   # size the player was asked to decode to
+
+        # decode thread and its ring of ready-to-blit frames
+        self.ring_size = 3
+        self._ring = deque(maxlen=self.ring_size)
+        self._ring_lock = threading.Lock()
+        self._player_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._eof = False
+        self._seek_gen = 0
+
+        # frames put on screen and frames skipped for being late
+        self.frames_shown = 0
+        self.frames_dropped = 0
+
+        # regions to redraw on the next draw() call
+        self._dirty = []
 
         # ffmpeg settings
         self.ff_opts = {
             'paused': 1,
             'an': 1 if not self.audio else 0,
             'sync': 'audio' if self.audio else 'video',
-            'fflags': 'nobuffer'
+            'fflags': 'nobuffer',
+            'out_fmt': 'rgb24'
         }
 
-        print("PATH:", self.video_path)
-        print("EXISTS:", os.path.exists(self.video_path))
+        # the player is opened by the decode thread, so panels open in
+        # parallel and the window shows up before any video is ready
+        self.failed = False
+        self._first_frame = None    # mute state while the first frame is decoded
+        self._thread = threading.Thread(target=self._open_and_decode, daemon=True)
+        self._thread.start()
 
+    def _open_and_decode(self, timeout=10.0):
         # player opening
         try:
-            self.player = MediaPlayer(
+            player = MediaPlayer(
                 self.video_path.encode('utf-8'),
                 ff_opts=self.ff_opts,
                 loglevel="quiet"
             )
         except Exception as e:
             print("Video açılamadı:", self.video_path, e)
-            self.player = None
+            self.failed = True
+            self.invalidate()
+            return
+
+        # duration and frame size up front, seeks work before the first frame
+        t0 = time.time()
+        meta = player.get_metadata() or {}
+        while not (meta.get("src_vid_size") or (0, 0))[0] or not meta.get("duration"):
+            if time.time() - t0 > timeout or self._stop.is_set():
+                break
+            self._stop.wait(0.005)
+            meta = player.get_metadata() or {}
+
+        with self._player_lock:
+            if self._stop.is_set():
+                # closed while opening
+                player.close_player()
+                return
+            self.player = player
+            self.duration = meta.get("duration") or None
+            if self.playing:
+                # toggled while opening
+                player.set_pause(False)
+            else:
+                # a paused player decodes nothing: run it muted up to the
+                # first frame, then pause it again
+                self._first_frame = player.get_mute()
+                player.set_mute(True)
+                player.set_pause(False)
+
+        self.configure_output()
+        self._decode_loop()
+
+    def set_rect(self, x, y, w, h):
+        # move/resize the panel and ask the player for the new output size
+        self.rect = pygame.Rect(x, y, w, h)
+        self.control_bar = ControlBar(
+            x,
+            y + h - self.control_height - self.margin,
+            w,
+            self.control_height,
+            margin=self.margin
+        )
+        self.control_bar.progress = self.progress
+        self.control_bar.playing = self.playing
+
+        self._out_size = None
+        self.configure_output()
+        self.invalidate()
+
+    def configure_output(self):
+        """Let ffmpeg scale frames to the fitted panel size, so frames
+        arrive ready to blit instead of being scaled in Python."""
+        if not self.player:
+            return
+
+        meta = self.player.get_metadata() or {}
+        src_w, src_h = meta.get("src_vid_size") or (0, 0)
+        if not src_w or not src_h:
+            # stream not opened yet, retried from update()
+            return
+
+        target = self.fit_size(src_w, src_h)
+        if target == self._out_size:
+            return
+
+        try:
+            with self._player_lock:
+                self.player.set_size(*target)
+            self._out_size = target
+        except Exception as e:
+            print("Output size could not be set:", e)
+            self._out_size = target
 
     def toggle(self):
         if not self.player:
+            if not self.failed:
+                # still opening, the player starts in this state
+                self.playing = not self.playing
             return
         self.playing = not self.playing
         try:
@@ -247,7 +515,13 @@ class VideoPanel:
             return
         ratio = max(0.0, min(1.0, ratio))
         try:
-            self.player.seek(self.duration * ratio, relative=False, accurate=False)
+            with self._player_lock:
+                self.player.seek(self.duration * ratio, relative=False, accurate=False)
+            # drop frames decoded before the seek
+            with self._ring_lock:
+                self._seek_gen += 1
+                self._ring.clear()
+            self._last_seek = time.time()
             self.progress = ratio
         except:
             pass
@@ -256,10 +530,12 @@ class VideoPanel:
         if not self.player:
             return
 
-        frame, val = self.player.get_frame()
+        if self._scaled_fast and self.smooth_scaling():
+            self.settle_frame()
 
-        # Is video done (can be frame or val EOF)
-        if frame == "eof" or val == "eof":
+        # Is video done (reported by the decode thread)
+        if self._eof:
+            self._eof = False
             if self.loop:
                 # Start again from beginning
                 self.set_position(0.0)
@@ -269,23 +545,43 @@ class VideoPanel:
                 self.playing = False
             return
 
-        if frame is None:
-            return
+        # only the newest decoded frame is shown, older ones are dropped
+        with self._ring_lock:
+            if not self._ring:
+                return
+            img, surf, target, fast = self._ring.pop()
+            # older frames were due before this one, they are not shown late
+            self.frames_dropped += len(self._ring)
+            self._ring.clear()
+        self.frames_shown += 1
 
-        # ffpyplayer sometimes returns (img, timestamp)
-        if isinstance(frame, tuple):
-            img = frame[0]
-        else:
-            img = frame
+        old_rect = self.video_rect() if self._target else None
 
-        # if img is frame 
         self.frame = img
+        self._buf = img
+        self._vid_size = img.get_size()
+        self._scaled = surf
+        self._target = target
+        self._scaled_fast = fast
+
+        # the frame size can change (resize, ffmpeg rounding), so the
+        # previous frame's area is repainted too; the first frame replaces
+        # the placeholder of the whole panel
+        new_rect = self.video_rect()
+        if old_rect is None:
+            new_rect = self.rect
+        elif old_rect != new_rect:
+            new_rect = new_rect.union(old_rect)
+        self.invalidate(new_rect)
 
         # time
         if self.duration is None:
             meta = self.player.get_metadata() or {}
             self.duration = meta.get("duration")
 
+        if self._out_size is None:
+            self.configure_output()
+
         # playing position
         try:
             pos = self.player.get_pts() or 0
@@ -298,42 +594,195 @@ class VideoPanel:
         self.control_bar.progress = self.progress
         self.control_bar.playing = self.playing
 
-    def draw(self, surface):
-        if self.frame is None:
-            self.control_bar.draw(surface, self)
-            return
-
-        img = self.frame
-
-        try:
-            w, h = img.get_size()
-            data = img.to_bytearray()[0]   # ffpyplayer -> raw RGB
-            
-            surf = pygame.image.frombuffer(data, (w, h), "RGB")
-
-            # scale as aspect ratio and fit into pannel
-            tw, th = self.rect.size
-            aspect = w / h
-
-            if tw / th > aspect:
-                new_h = th
-                new_w = int(new_h * aspect)
+    def _decode_loop(self):
+        # producer: pulls frames from the player into the ring, so decoding
+        # is not tied to the main loop's tick rate
+        while not self._stop.is_set():
+            seek_gen = self._seek_gen
+            with self._player_lock:
+                frame, val = self.player.get_frame()
+
+            # Is video done (can be frame or val EOF)
+            if frame == "eof" or val == "eof":
+                self._eof = True
+                self._stop.wait(0.05)
+                continue
+
+            if frame is None:
+                self._stop.wait(0.01)
+                continue
+
+            # ffpyplayer sometimes returns (img, timestamp)
+            if isinstance(frame, tuple):
+                img = frame[0]
             else:
-                new_w = tw
-                new_h = int(new_w / aspect)
+                img = frame
 
-            surf = pygame.transform.smoothscale(surf, (new_w, new_h))
+            try:
+                surf, target, fast = self.convert_frame(img)
+            except Exception as e:
+                print("Decode hata:", e)
+                continue
+
+            with self._ring_lock:
+                # a seek happened meanwhile, this frame is stale
+                if seek_gen == self._seek_gen:
+                    if len(self._ring) == self._ring.maxlen:
+                        self.frames_dropped += 1
+                    self._ring.append((img, surf, target, fast))   # maxlen drops the oldest
+
+            if self._first_frame is not None:
+                with self._player_lock:
+                    if not self.playing:
+                        self.player.set_pause(True)
+                    self.player.set_mute(self._first_frame)
+                self._first_frame = None
+            notify_frame()
+
+            if isinstance(val, (int, float)) and val > 0:
+                self._stop.wait(min(val, 0.05))
+
+    def close(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self.frames_dropped:
+            print(f"{os.path.basename(self.video_path)}: {self.frames_dropped} late frame(s) dropped, {self.frames_shown} shown")
+        with self._player_lock:
+            # under the lock: a player still being opened sees _stop and
+            # closes itself
+            player, self.player = self.player, None
+        if player:
+            try:
+                player.close_player()
+            except:
+                pass
 
-            x = self.rect.x + (tw - new_w) // 2
-            y = self.rect.y + (th - new_h) // 2
+    def fit_size(self, w, h):
+        # scale as aspect ratio and fit into pannel
+        tw, th = self.rect.size
+        aspect = w / h
 
-            surface.blit(surf, (x, y))
+        if tw / th > aspect:
+            new_h = th
+            new_w = int(new_h * aspect)
+        else:
+            new_w = tw
+            new_h = int(new_w / aspect)
+
+        return new_w, new_h
+
+    def frame_target(self, w, h):
+        if (w, h) == self._out_size:
+            return self._out_size
+        return self.fit_size(w, h)
+
+    def convert_frame(self, img, smooth=None):
+        """Wrap a decoded frame in a surface at its fitted panel size.
+        Returns the surface, its size and whether it was scaled the fast
+        way (see SCALE_QUALITIES)."""
+        w, h = img.get_size()
+        target = self.frame_target(w, h)
+
+        # wraps the frame memory, whoever keeps the surface keeps img too
+        data = img.to_memoryview()[0]   # ffpyplayer -> raw RGB
+        surf = pygame.image.frombuffer(data, (w, h), "RGB")
+
+        # frames already decoded at panel size are blitted as they are,
+        # only frames in flight during a resize still get scaled here
+        fast = False
+        if (w, h) != target:
+            if smooth is None:
+                smooth = self.smooth_scaling()
+            if smooth:
+                surf = pygame.transform.smoothscale(surf, target)
+            else:
+                surf = pygame.transform.scale(surf, target)
+                fast = True
+        return surf, target, fast
+
+    def smooth_scaling(self):
+        # "auto": fast while playing or scrubbing
+        if self.scale_quality != "auto":
+            return self.scale_quality == "smooth"
+        if self.playing:
+            return False
+        return time.time() - self._last_seek >= SETTLE_TIME
+
+    def settle_frame(self):
+        # the video stopped on a fast scaled frame: one smooth pass
+        self._scaled, self._target, self._scaled_fast = self.convert_frame(self.frame, smooth=True)
+        self.invalidate(self.video_rect())
+
+    def render_frame(self):
+        """Return the scaled surface for self.frame, reusing the cache
+        while the frame and the fitted target size stay the same."""
+        img = self.frame
+        w, h = img.get_size()
+        target = self.frame_target(w, h)
+
+        if self._buf is not img or self._target != target:
+            self._scaled, self._target, self._scaled_fast = self.convert_frame(img)
+            self._buf = img
+            self._vid_size = (w, h)
+
+        return self._scaled
+
+    def video_rect(self):
+        # where the current frame is blitted, centered in the panel
+        new_w, new_h = self._target
+        tw, th = self.rect.size
+        x = self.rect.x + (tw - new_w) // 2
+        y = self.rect.y + (th - new_h) // 2
+        return pygame.Rect(x, y, new_w, new_h)
+
+    def invalidate(self, rect=None):
+        # mark a part of the panel (default: all of it) to be redrawn
+        if rect is None:
+            rect = self.rect
+        self._dirty.append(pygame.Rect(rect).clip(self.rect))
+
+    def draw(self, surface, force=False):
+        """Redraw only the parts of the panel that changed since the last
+        call and return them as dirty rects."""
+        if force:
+            regions = [self.rect]
+        else:
+            regions = self._dirty
+            if self.control_bar.changed(self):
+                regions.append(self.control_bar.area)
+        self._dirty = []
 
-        except Exception as e:
-            print("Draw hata:", e)
+        if not regions:
+            return []
 
-        self.control_bar.draw(surface, self)
+        surf = None
+        if self.frame is not None:
+            try:
+                surf = self.render_frame()
+                pos = self.video_rect().topleft
+            except Exception as e:
+                print("Draw hata:", e)
+
+        placeholder = None
+        if self.frame is None:
+            # until the first frame is decoded
+            text = "Video açılamadı" if self.failed else "Loading..."
+            placeholder = text_cache.render(text, (120, 120, 120), text_cache.font(None, 26))
+            placeholder_pos = placeholder.get_rect(center=self.rect.center).topleft
+
+        for region in regions:
+            surface.set_clip(region)
+            surface.fill((0, 0, 0), region)
+            if surf is not None:
+                surface.blit(surf, pos)
+            elif placeholder is not None:
+                surface.blit(placeholder, placeholder_pos)
+            self.control_bar.draw(surface, self)
+        surface.set_clip(None)
 
+        return regions
 
     def handle_mouse_event(self, pos, button):
         self.control_bar.handle_mouse_event(pos, button, self)
@@ -359,52 +808,40 @@ class VideoPanel:
 # Main Application
 # -----------------------------------------------------------
 class VideoApp:
-    def __init__(self):
+    def __init__(self, left_path=None, right_path=None):
         info = pygame.display.Info()
         self.W, self.H = max(800, info.current_w // 1), max(600, info.current_h // 1)
         self.screen = pygame.display.set_mode((self.W, self.H), pygame.RESIZABLE)
         pygame.display.set_caption("Video Panel + Kayıt Listesi")
         self.show_marker = False
+        self.marker_rect = pygame.Rect(10, 30, 40, 40)
+        self._marker_drawn = False
+
+        # first frame (and resize / expose) repaints the whole window,
+        # afterwards only the changed regions are pushed
+        self.full_redraw = True
 
-        self.font = pygame.font.SysFont(None, 32)
-        self.small_font = pygame.font.SysFont(None, 22)
-        self.clock = pygame.time.Clock()
+        self.font = text_cache.font(None, 32)
+        self.small_font = text_cache.font(None, 22)
+        self.pacer = FramePacer()
         self.running = True
 
         # Layout
-        self.left_w = int(self.W * 0.70)
-        self.right_w = self.W - self.left_w
-        self.right_video_h = int(self.H * 0.45)
-        self.button_h = 60
-        self.list_y = self.right_video_h + self.button_h
-        self.list_h = self.H - self.list_y
+        self.compute_layout()
 
-        self.list_x = self.left_w + 10
-        self.list_y = self.right_video_h + self.button_h + 10
-        self.list_w = self.right_w - 20
-        self.list_h = self.H - self.list_y - 10
-
-        video_extensions = ["mp4","mov","avi","mkv"]
-
-        match1 = []
-        match2 = []
+        if not (left_path and right_path):
+            # same pick as the other tools
+            left_path = first_video(".", "control_")
+            right_path = first_video(".", "reference_")
 
-        for ext in video_extensions:
-            match1.extend(glob.glob(os.path.join(f"control_*.{ext}")))
-            match2.extend(glob.glob(os.path.join(f"reference_*.{ext}")))
+        print("Bulunan control dosyası:", left_path)
+        print("Bulunan reference dosyası:", right_path)
 
-        # prevent double record
-        match1 = list(set(match1))
-        match2 = list(set(match2))
-
-        print("Bulunan control dosyaları:", match1)
-        print("Bulunan reference dosyaları:", match2)
-
-        if not match1 or not match2:
+        if not left_path or not right_path:
             raise FileNotFoundError("control_ veya reference_ videoları bulunamadı.")
 
-        video1 = os.path.normpath(match1[0]) # 'control_xxxx.mp4'
-        video2 = os.path.normpath(match2[0]) # 'reference_xxxx.mp4'
+        video1 = os.path.normpath(left_path) # 'control_xxxx.mp4'
+        video2 = os.path.normpath(right_path) # 'reference_xxxx.mp4'
 
         # video1 ve video2 must be a 'str' type
 
@@ -419,38 +856,116 @@ class VideoApp:
         self.intervals = []
         self.current_start = -1
 
-        # open CSV file for appending
-        self.csv_path = 'output.csv'
-        new_file = not os.path.exists(self.csv_path)
-        self.csvfile = open(self.csv_path, 'a', newline='', encoding='utf-8')
-        self.csvwriter = csv.writer(self.csvfile)
-        if new_file:
-            # Header: start_seconds, end_seconds, start_hms, end_hms
-            self.csvwriter.writerow(['start', 'end'])
-            self.csvfile.flush()
+        # optional project file: intervals are read from / written to it
+        # instead of output.csv; both sit beside the control video, like
+        # IntervalMatchingApp's files in the pair directory
+        directory = os.path.dirname(video1)
+        self.store = ProjectStore.open_if_exists(os.path.join(directory, PROJECT_FILE))
+        self.pair = pair_name(video1)
+        self.csvfile = None
+
+        if self.store:
+            self.intervals = self.store.load_intervals(self.pair, "output")
+            self.scroll_list.set_items(self.intervals)
+        else:
+            # open CSV file for appending
+            self.csv_path = os.path.join(directory, 'output.csv')
+            new_file = not os.path.exists(self.csv_path)
+            self.csvfile = open(self.csv_path, 'a', newline='', encoding='utf-8')
+            self.csvwriter = csv.writer(self.csvfile)
+            if new_file:
+                # Header: start_seconds, end_seconds, start_hms, end_hms
+                self.csvwriter.writerow(['start', 'end'])
+                self.csvfile.flush()
+
+    def compute_layout(self):
+        self.left_w = int(self.W * 0.70)
+        self.right_w = self.W - self.left_w
+        self.right_video_h = int(self.H * 0.45)
+        self.button_h = 60
+
+        self.list_x = self.left_w + 10
+        self.list_y = self.right_video_h + self.button_h + 10
+        self.list_w = self.right_w - 20
+        self.list_h = self.H - self.list_y - 10
+
+    def resize(self, w, h):
+        # window resized: recompute layout and reconfigure players output size
+        self.W, self.H = max(800, w), max(600, h)
+        self.screen = pygame.display.get_surface()
+        self.compute_layout()
+
+        self.left_panel.set_rect(0, 0, self.left_w, self.H)
+        self.right_panel.set_rect(self.left_w, 0, self.right_w, self.right_video_h)
+
+        self.scroll_list.rect = pygame.Rect(self.list_x, self.list_y, self.list_w, self.list_h)
+        self.scroll_list.scroll(0)
+
+        self.close_button.rect = pygame.Rect(self.W - 120, 10, 110, 40)
+        self.full_redraw = True
 
     def run(self):
         try:
             while self.running:
-                self.handle_events()
+                self.handle_events(self.wait())
                 self.update()
                 self.draw()
-                self.clock.tick(30)
         finally:
             # Close file in any case to prevent data loss
             try:
-                self.csvfile.close()
+                if self.csvfile:
+                    self.csvfile.close()
+                if self.store:
+                    self.store.close()
             except Exception:
                 pass
+            self.left_panel.close()
+            self.right_panel.close()
             pygame.quit()
 
-    def handle_events(self):
-        for e in pygame.event.get():
+    def is_idle(self):
+        # nothing can change on screen without input
+        for panel in (self.left_panel, self.right_panel):
+            if panel.playing or panel._first_frame is not None or (panel.frame is None and not panel.failed):
+                return False
+            if panel._scaled_fast:
+                return False
+        return True
+
+    def wait(self):
+        """Until the next loop pass: paced by the frames while a video
+        plays, otherwise blocked on input. Returns the event that ended an
+        idle wait, it is handled first."""
+        if not self.is_idle():
+            self.pacer.wait()
+            return None
+
+        idle_waiting.set()
+        if frame_ready.is_set():
+            # a frame came in since the last pass, before the flag was up
+            idle_waiting.clear()
+            frame_ready.clear()
+            return None
+        e = pygame.event.wait(IDLE_TIMEOUT_MS)
+        idle_waiting.clear()
+        frame_ready.clear()
+        return e if e.type != pygame.NOEVENT else None
+
+    def handle_events(self, first=None):
+        events = pygame.event.get()
+        if first is not None:
+            events.insert(0, first)
+
+        for e in events:
             # Closing window or pressing ESC
             if e.type == pygame.QUIT:
                 self.running = False
             elif e.type == pygame.KEYDOWN and e.key == pygame.K_ESCAPE:
                 self.running = False
+            elif e.type == pygame.VIDEORESIZE:
+                self.resize(e.w, e.h)
+            elif e.type == pygame.VIDEOEXPOSE:
+                self.full_redraw = True
 
             # Mouse events
             elif e.type == pygame.MOUSEBUTTONDOWN:
@@ -491,13 +1006,16 @@ class VideoApp:
                             (self.left_panel.format_time(i['start']), self.left_panel.format_time(i['end']))
                             for i in self.intervals
                         ])
-                        # Write into CSV: numeric second, then readable format
+                        # Write into the project file or CSV: numeric second, then readable format
                         try:
-                            self.csvwriter.writerow([
-                                self.left_panel.format_time(s_val),
-                                self.left_panel.format_time(e_val)
-                            ])
-                            self.csvfile.flush()
+                            if self.store:
+                                item['db_id'] = self.store.add_interval(self.pair, "output", s_val, e_val)
+                            else:
+                                self.csvwriter.writerow([
+                                    self.left_panel.format_time(s_val),
+                                    self.left_panel.format_time(e_val)
+                                ])
+                                self.csvfile.flush()
                         except Exception as ex:
                             print("CSV yazma hatası:", ex)
                         self.current_start = -1
@@ -505,6 +1023,16 @@ class VideoApp:
                         # update scroll list items
                         self.scroll_list.set_items(self.intervals)
 
+                # List paging
+                elif e.key == pygame.K_PAGEUP:
+                    self.scroll_list.page(-1)
+                elif e.key == pygame.K_PAGEDOWN:
+                    self.scroll_list.page(1)
+                elif e.key == pygame.K_HOME:
+                    self.scroll_list.scroll_to_index(0)
+                elif e.key == pygame.K_END:
+                    self.scroll_list.scroll_to_index(len(self.scroll_list.items))
+
     def update(self):
         self.left_panel.update()
         self.right_panel.update()
@@ -512,26 +1040,46 @@ class VideoApp:
         self.scroll_list.set_items(self.intervals)
 
     def draw(self):
-        self.screen.fill((0, 0, 0))
+        full = self.full_redraw
+        self.full_redraw = False
+        rects = []
+
+        if full:
+            self.screen.fill((0, 0, 0))
+
+        # marker was hidden, the video under it has to come back
+        if self._marker_drawn and not self.show_marker:
+            self.left_panel.invalidate(self.marker_rect)
+
         # Videos
-        self.left_panel.draw(self.screen)
-        self.right_panel.draw(self.screen)
+        rects += self.left_panel.draw(self.screen, force=full)
+        rects += self.right_panel.draw(self.screen, force=full)
 
         # If marker is active, draw a red circle
-        if self.show_marker:
-            pygame.draw.circle(self.screen, (200, 0, 0), (30, 50), 20)
+        if self.show_marker and (not self._marker_drawn or self.marker_rect.collidelist(rects) != -1):
+            pygame.draw.circle(self.screen, (200, 0, 0), self.marker_rect.center, 20)
+            rects.append(self.marker_rect)
+        self._marker_drawn = self.show_marker
 
         # Interval list area and content
-        self.scroll_list.draw(self.screen, self.small_font, self.left_panel.format_time)
+        if self.scroll_list.draw(self.screen, self.small_font, self.left_panel.format_time, force=full):
+            rects.append(self.scroll_list.rect)
+
+        # Close button, repainted only when something was drawn under it
+        if full or self.close_button.rect.collidelist(rects) != -1:
+            self.close_button.draw(self.screen)
+            rects.append(self.close_button.rect)
 
-        # Close button
-        self.close_button.draw(self.screen)
-        pygame.display.flip()
+        if full:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
 
 
 if __name__ == "__main__":
     # python app.py left.mp4 right.mp4
+    left_path = right_path = None
     if len(sys.argv) >= 3:
         left_path = sys.argv[1]
         right_path = sys.argv[2]
-    VideoApp().run()
+    VideoApp(left_path, right_path).run()
@@ -1,12 +1,211 @@
 import pygame
 from ffpyplayer.player import MediaPlayer
-import glob
+from ProjectStore import ProjectStore, PROJECT_FILE, MATCHES_FILE, pair_name, find_pairs
+from ThumbnailCache import ThumbnailCache, build_thumbnails, THUMB_SIZE
+from KeyframeIndex import KeyframeIndex, seek_frame
+from SimilarityIndex import HashIndex, TOP_K
+from AudioFingerprint import AudioFingerprints, match_interval
+from collections import deque, OrderedDict
+from bisect import bisect_right
+import threading
+import json
+import time
 import csv
 import sys
 import os
 
 pygame.init()
 
+# -----------------------------------------------------------
+# Text Cache
+# -----------------------------------------------------------
+class TextCache:
+    """Loads every font once and keeps an LRU of rendered text surfaces
+    keyed by (text, color, font)."""
+    def __init__(self, max_items=1024):
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.max_items = max_items
+
+    def font(self, name, size):
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.SysFont(name, size)
+            self.fonts[key] = font
+        return font
+
+    def render(self, text, color, font):
+        key = (text, color, font)
+        surf = self.surfaces.get(key)
+        if surf is not None:
+            self.surfaces.move_to_end(key)
+            return surf
+
+        surf = font.render(text, True, color)
+        self.surfaces[key] = surf
+        if len(self.surfaces) > self.max_items:
+            self.surfaces.popitem(last=False)   # least recently used
+        return surf
+
+
+# shared by every widget
+text_cache = TextCache()
+
+
+# -----------------------------------------------------------
+# Frame Timing
+# -----------------------------------------------------------
+# one JSON line per second while the overlay is on, rolled over to
+# '<file>.1' when it grows past METRICS_MAX_BYTES
+METRICS_FILE = "frame_metrics.jsonl"
+METRICS_MAX_BYTES = 5 * 1024 * 1024
+
+
+class FrameStats:
+    """Per-stage timers of the main loop, the panels and their decode
+    threads, summed per second. Callers check `enabled` before reading the
+    clock, so while it is off the cost is one attribute lookup per stage."""
+    def __init__(self, path=METRICS_FILE, max_bytes=METRICS_MAX_BYTES):
+        self.enabled = False
+        self.path = path
+        self.max_bytes = max_bytes
+        self.last = None        # summary of the last full second (overlay)
+        self.version = 0
+        self._totals = {}       # stage -> [seconds, calls]
+        self._counters = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+        self._since = time.perf_counter()
+        self._file = None
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        with self._lock:
+            self._totals, self._counters, self._gauges = {}, {}, {}
+        self._since = time.perf_counter()
+        self.last = None
+        if not self.enabled:
+            self.close()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            total = self._totals.get(stage)
+            if total is None:
+                total = self._totals[stage] = [0.0, 0]
+            total[0] += seconds
+            total[1] += 1
+
+    def count(self, name, n=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def gauge(self, name, value):
+        self._gauges[name] = value
+
+    def roll(self):
+        """Called once per main loop pass: closes the second when it is
+        over and writes it to the metrics file."""
+        now = time.perf_counter()
+        elapsed = now - self._since
+        if elapsed < 1.0:
+            return
+        with self._lock:
+            totals, self._totals = self._totals, {}
+            counters, self._counters = self._counters, {}
+        self._since = now
+
+        self.last = {
+            "time": round(time.time(), 3),
+            "seconds": round(elapsed, 3),
+            "stages": {
+                stage: {"ms": round(sec * 1000 / calls, 3), "calls": calls, "ms_per_s": round(sec * 1000 / elapsed, 2)}
+                for stage, (sec, calls) in totals.items()
+            },
+            "counters": counters,
+            "gauges": {name: round(value, 2) for name, value in self._gauges.items()},
+        }
+        self.version += 1
+        self.write(self.last)
+
+    def write(self, record):
+        try:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+            if self._file.tell() > self.max_bytes:
+                self._file.close()
+                self._file = None
+                os.replace(self.path, self.path + ".1")
+        except OSError as e:
+            print("Metrics file could not be written:", self.path, e)
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+frame_stats = FrameStats()
+
+
+# -----------------------------------------------------------
+# Frame Pacing
+# -----------------------------------------------------------
+# used when the display does not report its refresh rate
+DISPLAY_FPS = 60
+
+# the loop still runs this often without new frames, for input
+IDLE_FPS = 30
+
+# set by the decode threads whenever a frame is ready to be shown
+frame_ready = threading.Event()
+
+# idle mode: while nothing plays the loop blocks on pygame.event.wait,
+# woken by input, by WAKE_EVENT from a decode thread, or by the timeout
+# (background thumbnails and the like)
+IDLE_TIMEOUT_MS = 500
+WAKE_EVENT = pygame.event.custom_type()
+idle_waiting = threading.Event()
+
+
+def notify_frame():
+    # decode thread side: a frame is ready for the main loop
+    frame_ready.set()
+    if idle_waiting.is_set():
+        idle_waiting.clear()
+        pygame.event.post(pygame.event.Event(WAKE_EVENT))
+
+
+class FramePacer:
+    """Decides when the main loop runs next. The decode threads hand
+    frames over when get_frame says they are due (its delay value), and
+    the loop wakes up for them instead of ticking at a fixed rate, but
+    not more often than the display refreshes."""
+    def __init__(self, refresh_rate=None, idle_fps=IDLE_FPS):
+        if not refresh_rate:
+            # pygame-ce only, plain pygame does not report the rate
+            get_rate = getattr(pygame.display, "get_current_refresh_rate", None)
+            refresh_rate = (get_rate() if get_rate else 0) or DISPLAY_FPS
+        self.refresh_rate = refresh_rate
+        self.min_interval = 1.0 / refresh_rate
+        self.max_interval = 1.0 / idle_fps
+        self._last = time.perf_counter()
+
+    def wait(self):
+        now = time.perf_counter()
+        deadline = self._last + self.max_interval
+        if deadline > now:
+            frame_ready.wait(deadline - now)
+
+        # a frame is shown at most once per display refresh
+        early = self._last + self.min_interval - time.perf_counter()
+        if early > 0:
+            time.sleep(early)
+        frame_ready.clear()
+        self._last = time.perf_counter()
+
 # -----------------------------------------------------------
 # Button Class
 # -----------------------------------------------------------
@@ -19,7 +218,7 @@ class Button:
 
     def draw(self, screen):
         pygame.draw.rect(screen, self.color, self.rect)
-        text_surf = self.font.render(self.text, True, (255, 255, 255))
+        text_surf = text_cache.render(self.text, (255, 255, 255), self.font)
         screen.blit(text_surf, (self.rect.x + 10, self.rect.y + (self.rect.h - text_surf.get_height()) // 2))
 
     def is_pressed(self, pos):
@@ -35,9 +234,17 @@ class ScrollList:
         self.items = []  # each item is a dict: {'start':, 'end':}
         self.scroll_offset = 0
         self.item_height = item_height
+        self._drawn_state = None
+
+        # per-list caches, reset when a different items list is set
+        self._labels = {}     # (start, end, sep, formatter) -> text
+        self._starts = None   # start values for bisect
 
     def set_items(self, items):
         """items: list of dicts with start,end"""
+        if items is not self.items:
+            self._labels = {}
+            self._starts = None
         self.items = items
 
     def scroll(self, delta):
@@ -49,15 +256,69 @@ class ScrollList:
         visible = self.rect.h // self.item_height
         return start_idx, visible
 
-    def draw(self, surface, font, format_time_func):
+    def page(self, pages):
+        # keyboard paging, one page is the number of fully visible rows
+        visible = max(1, self.rect.h // self.item_height)
+        self.scroll(pages * visible * self.item_height)
+
+    def scroll_to_index(self, idx):
+        # put row idx at the top (clamped at the end of the list)
+        self.scroll_offset = 0
+        self.scroll(idx * self.item_height)
+
+    def index_at(self, pos):
+        """Row under pos, O(1) since every row has the same height."""
+        if not self.rect.collidepoint(pos):
+            return None
+
+        rel_y = pos[1] - self.rect.y + self.scroll_offset
+        idx = rel_y // self.item_height
+        if 0 <= idx < len(self.items):
+            return idx
+        return None
+
+    def index_for_time(self, sec):
+        """Binary search for the last item starting at or before sec.
+        Items must be sorted by start (load_csv does that)."""
+        if not self.items:
+            return None
+        if self._starts is None or len(self._starts) != len(self.items):
+            self._starts = [it["start"] for it in self.items]
+        idx = bisect_right(self._starts, sec) - 1
+        return max(0, idx)
+
+    def jump_to_time(self, sec):
+        idx = self.index_for_time(sec)
+        if idx is not None:
+            self.scroll_to_index(idx)
+        return idx
+
+    def row_text(self, i, format_time_func, sep="  -  "):
+        item = self.items[i]
+        key = (item["start"], item["end"], sep, format_time_func)
+        text = self._labels.get(key)
+        if text is None:
+            if len(self._labels) > 4096:
+                self._labels.clear()
+            text = f"{format_time_func(item['start'])}{sep}{format_time_func(item['end'])}"
+            self._labels[key] = text
+        return text
+
+    def draw(self, surface, font, format_time_func, force=False):
+        # skip when nothing visible changed, returns True if it was drawn
+        state = (self.scroll_offset, len(self.items), tuple(self.rect))
+        if not force and state == self._drawn_state:
+            return False
+        self._drawn_state = state
+
         pygame.draw.rect(surface, (40, 40, 40), self.rect)
         start_idx, visible = self.visible_range()
         for i in range(start_idx, min(len(self.items), start_idx + visible)):
-            item = self.items[i]
             y = self.rect.y + (i - start_idx) * self.item_height + 4
-            text = f"{format_time_func(item['start'])}  -  {format_time_func(item['end'])}"
-            t_surf = font.render(text, True, (200, 200, 200))
+            text = self.row_text(i, format_time_func)
+            t_surf = text_cache.render(text, (200, 200, 200), font)
             surface.blit(t_surf, (self.rect.x + 8, y))
+        return True
 
 
 # -----------------------------------------------------------
@@ -92,7 +353,22 @@ class ControlBar:
         self.play_rect = pygame.Rect(start_x + self.btn_w + spacing, btn_y, self.btn_w, self.btn_h)
         self.next_rect = pygame.Rect(start_x + (self.btn_w + spacing) * 2, btn_y, self.btn_w, self.btn_h)
 
+        # everything the bar paints (time text and buttons reach outside self.rect)
+        text_rect = pygame.Rect(bar_x, bar_y - 22, bar_w, 22)
+        self.area = self.rect.unionall([text_rect, self.back_rect, self.play_rect, self.next_rect])
+        self._drawn_state = None
+
+    def state(self, video_panel):
+        duration = video_panel.duration if video_panel.duration is not None else 0
+        current_sec = int(duration * self.progress) if duration else 0
+        fill_w = int(self.progress_rect.width * self.progress)
+        return fill_w, self.playing, current_sec, int(duration)
+
+    def changed(self, video_panel):
+        return self.state(video_panel) != self._drawn_state
+
     def draw(self, surface, video_panel):
+        self._drawn_state = self.state(video_panel)
         pygame.draw.rect(surface, (50, 50, 50), self.rect)
 
         # Progress bar
@@ -110,14 +386,14 @@ class ControlBar:
         pygame.draw.rect(surface, (0, 0, 200), self.next_rect)
 
         # --- Time text ---
-        font = pygame.font.SysFont(None, 22)
+        font = text_cache.font(None, 22)
 
         duration = video_panel.duration if video_panel.duration is not None else 0
         current_sec = duration * self.progress if duration else 0
         total_sec = duration
 
-        left_text = font.render(self.format_time(current_sec), True, (255, 255, 255))
-        right_text = font.render(self.format_time(total_sec), True, (255, 255, 255))
+        left_text = text_cache.render(self.format_time(current_sec), (255, 255, 255), font)
+        right_text = text_cache.render(self.format_time(total_sec), (255, 255, 255), font)
 
         surface.blit(left_text, (self.progress_rect.x, self.progress_rect.y - 22))
         surface.blit(right_text, (self.progress_rect.x + self.progress_rect.width - right_text.get_width(),
@@ -160,11 +436,30 @@ class ControlBar:
 # -----------------------------------------------------------
 # Video Panel Class
 # -----------------------------------------------------------
+# scaling of frames that do not come out of ffmpeg at the panel size
+# (in flight during a resize, or a player that ignores set_size):
+# "auto" scales fast while the video moves and redoes the shown frame
+# smoothly once it stands still, "smooth" and "fast" always use one way
+SCALE_QUALITIES = ("auto", "smooth", "fast")
+
+# a frame within this many seconds of a seek still counts as scrubbing
+SETTLE_TIME = 0.25
+
+# scale quality of each panel, by panel name
+PANEL_SCALE_QUALITY = {"film": "auto", "game": "auto"}
+
 class VideoPanel:
-    def __init__(self, x, y, w, h, video_path, audio=True, loop=False):
+    def __init__(self, x, y, w, h, video_path, audio=True, loop=False, name="video", scale_quality="auto"):
         # main pannel area
         self.rect = pygame.Rect(x, y, w, h)
         self.video_path = video_path
+        self.name = name        # prefix of the panel's frame timing entries
+
+        if scale_quality not in SCALE_QUALITIES:
+            raise ValueError("scale_quality: " + ", ".join(SCALE_QUALITIES))
+        self.scale_quality = scale_quality
+        self._scaled_fast = False   # shown frame waits for a smooth pass
+        self._last_seek = 0.0
 
         self.audio = audio
         self.loop = loop
@@ -192,31 +487,170 @@ class VideoPanel:
         self._vid_size = None
         self._scaled = None
         self._target = None
+        self._out_size = None   # size the player was asked to decode to
+
+        # decode thread and its ring of ready-to-blit frames
+        self.ring_size = 3
+        self._ring = deque(maxlen=self.ring_size)
+        self._ring_lock = threading.Lock()
+        self._player_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._eof = False
+        self._seek_gen = 0
+
+        # frame-accurate seeking: keyframe index of the video and the
+        # [keyframe, second, started, synced] of the seek in progress
+        self.keyframes = None
+        self._seek_target = None
+        self._keyframe_thread = None
+        self._muted = None      # mute state to restore after a paused seek
+
+        # interval loop: (start, end) played over and over, restarted from a
+        # pre-warmed player of the pool when there is one
+        self.loop_range = None
+        self.pool = None
+        self._last_pts = None
+
+        # regions to redraw on the next draw() call
+        self._dirty = []
+
+        # (pts, wall clock, seek generation) playback drift is measured from
+        self._clock_ref = None
+
+        # frames put on screen and frames skipped for being late
+        self.frames_shown = 0
+        self.frames_dropped = 0
 
         # ffmpeg settings
         self.ff_opts = {
             'paused': 1,
             'an': 1 if not self.audio else 0,
             'sync': 'audio' if self.audio else 'video',
-            'fflags': 'nobuffer'
+            'fflags': 'nobuffer',
+            'out_fmt': 'rgb24'
         }
 
-        print("PATH:", self.video_path)
-        print("EXISTS:", os.path.exists(self.video_path))
+        # the player is opened by the decode thread, so panels open in
+        # parallel and the window shows up before any video is ready;
+        # a seek asked for before that is kept until the duration is known
+        self.failed = False
+        self._pending_seek = None
+        self._thread = threading.Thread(target=self._open_and_decode, daemon=True)
+        self._thread.start()
 
+    def _open_and_decode(self, timeout=10.0):
         # player openning
         try:
-            self.player = MediaPlayer(
+            player = MediaPlayer(
                 self.video_path.encode('utf-8'),
                 ff_opts=self.ff_opts,
                 loglevel="quiet"
             )
         except Exception as e:
             print("Video açılamadı:", self.video_path, e)
-            self.player = None
+            self.failed = True
+            self.invalidate()
+            return
+
+        # duration and frame size up front, seeks work before the first frame
+        t0 = time.time()
+        meta = player.get_metadata() or {}
+        while not (meta.get("src_vid_size") or (0, 0))[0] or not meta.get("duration"):
+            if time.time() - t0 > timeout or self._stop.is_set():
+                break
+            self._stop.wait(0.005)
+            meta = player.get_metadata() or {}
+
+        with self._player_lock:
+            if self._stop.is_set():
+                # closed while opening
+                player.close_player()
+                return
+            self.player = player
+            self.duration = meta.get("duration") or None
+            if self.playing:
+                # toggled while opening
+                player.set_pause(False)
+            else:
+                # a paused player decodes nothing: run it muted up to the
+                # first frame, _end_seek() pauses it again
+                self._muted = player.get_mute()
+                player.set_mute(True)
+                player.set_pause(False)
+                self._seek_target = [0.0, 0.0, time.time(), True]
+
+        self.configure_output()
+        self.load_keyframes()
+        self._decode_loop()
+
+    def load_keyframes(self):
+        # sidecar from an earlier run, else a one-time scan in the background
+        try:
+            index = KeyframeIndex(self.video_path)
+        except OSError as e:
+            print("Keyframe index açılamadı:", e)
+            return
+        if index.times:
+            self.keyframes = index
+            return
+
+        def scan():
+            try:
+                if index.scan(stop=self._stop):
+                    self.keyframes = index
+            except Exception as e:
+                print("Keyframe scan hata:", e)
+
+        self._keyframe_thread = threading.Thread(target=scan, daemon=True)
+        self._keyframe_thread.start()
+
+    def set_rect(self, x, y, w, h):
+        # move/resize the panel and ask the player for the new output size
+        self.rect = pygame.Rect(x, y, w, h)
+        self.control_bar = ControlBar(
+            x,
+            y + h - self.control_height - self.margin,
+            w,
+            self.control_height,
+            margin=self.margin
+        )
+        self.control_bar.progress = self.progress
+        self.control_bar.playing = self.playing
+
+        self._out_size = None
+        self.configure_output()
+        self.invalidate()
+
+    def configure_output(self):
+        """Let ffmpeg scale frames to the fitted panel size, so frames
+        arrive ready to blit instead of being scaled in Python."""
+        if not self.player:
+            return
+
+        meta = self.player.get_metadata() or {}
+        src_w, src_h = meta.get("src_vid_size") or (0, 0)
+        if not src_w or not src_h:
+            # stream not opened yet, retried from update()
+            return
+
+        target = self.fit_size(src_w, src_h)
+        if target == self._out_size:
+            return
+
+        try:
+            with self._player_lock:
+                self.player.set_size(*target)
+            self._out_size = target
+        except Exception as e:
+            print("Output size could not be set:", e)
+            self._out_size = target
 
     def toggle(self):
         if not self.player:
+            if not self.failed:
+                # still opening, the player starts in this state
+                self.playing = not self.playing
             return
         self.playing = not self.playing
         try:
@@ -246,22 +680,46 @@ class VideoPanel:
         if not self.player or self.duration is None:
             return
         ratio = max(0.0, min(1.0, ratio))
+        self._end_seek()
         try:
-            self.player.seek(self.duration * ratio, relative=False, accurate=False)
+            with self._player_lock:
+                self.player.seek(self.duration * ratio, relative=False, accurate=False)
+            # drop frames decoded before the seek
+            with self._ring_lock:
+                self._seek_gen += 1
+                self._ring.clear()
+            self._last_seek = time.time()
             self.progress = ratio
         except:
             pass
 
     def update(self):
+        if not frame_stats.enabled:
+            self._update()
+        else:
+            t0 = time.perf_counter()
+            self._update()
+            frame_stats.add(self.name + ".update", time.perf_counter() - t0)
+
+        if self._scaled_fast and self.smooth_scaling():
+            self.settle_frame()
+
+    def _update(self):
         if not self.player:
             return
 
-        frame, val = self.player.get_frame()
-
-        # Is video done (can be frame or val EOF)
-        if frame == "eof" or val == "eof":
-            if self.loop:
-                # Start from beginning
+        if self._pending_seek is not None and self.duration:
+            sec, self._pending_seek = self._pending_seek, None
+            self.seek_to_second(sec)
+
+        # Is video done (reported by the decode thread)
+        if self._eof:
+            self._eof = False
+            if self.loop_range and self.playing:
+                # interval runs up to the end of the file
+                self.restart_loop()
+            elif self.loop:
+                # Start again from beginning
                 self.set_position(0.0)
                 self.player.set_pause(False)
                 self.playing = True
@@ -269,28 +727,60 @@ class VideoPanel:
                 self.playing = False
             return
 
-        if frame is None:
-            return
-
-        # ffpyplayer sometimes return (img, timestamp)
-        if isinstance(frame, tuple):
-            img = frame[0]
-        else:
-            img = frame
+        # only the newest decoded frame is shown: the older ones were due
+        # before it and are dropped instead of being shown late
+        with self._ring_lock:
+            if not self._ring:
+                return
+            img, pts, surf, target, fast = self._ring.pop()
+            dropped = len(self._ring)
+            self._ring.clear()
+            # the decode thread counts its drops under the same lock
+            self.frames_dropped += dropped
+        self.frames_shown += 1
+
+        if frame_stats.enabled:
+            # decoded but never shown, and how far playback is off the clock
+            frame_stats.count(self.name + ".shown")
+            if dropped:
+                frame_stats.count(self.name + ".dropped", dropped)
+            self.track_drift(pts)
+
+        old_rect = self.video_rect() if self._target else None
 
-        # if img is a frame
         self.frame = img
+        self._buf = img
+        self._vid_size = img.get_size()
+        self._scaled = surf
+        self._target = target
+        self._scaled_fast = fast
+
+        # the frame size can change (resize, ffmpeg rounding), so the
+        # previous frame's area is repainted too; the first frame replaces
+        # the placeholder of the whole panel
+        new_rect = self.video_rect()
+        if old_rect is None:
+            new_rect = self.rect
+        elif old_rect != new_rect:
+            new_rect = new_rect.union(old_rect)
+        self.invalidate(new_rect)
 
         # time
         if self.duration is None:
             meta = self.player.get_metadata() or {}
             self.duration = meta.get("duration")
 
-        # playing position
-        try:
-            pos = self.player.get_pts() or 0
-        except:
-            pos = 0
+        if self._out_size is None:
+            self.configure_output()
+
+        # playing position, from the frame itself when it has a timestamp
+        if pts is not None:
+            pos = pts
+        else:
+            try:
+                pos = self.player.get_pts() or 0
+            except:
+                pos = 0
 
         if self.duration:
             self.progress = pos / self.duration
@@ -298,42 +788,327 @@ class VideoPanel:
         self.control_bar.progress = self.progress
         self.control_bar.playing = self.playing
 
-    def draw(self, surface):
-        if self.frame is None:
-            self.control_bar.draw(surface, self)
+        # the frame at the loop end was shown, continue from the start
+        if self.loop_range and self.playing and pts is not None:
+            end = self.loop_range[1] - self.frame_duration() / 2
+            if self._last_pts is not None and self._last_pts < end <= pts:
+                self.restart_loop()
+        self._last_pts = pts
+
+    def _decode_loop(self):
+        # producer: pulls frames from the player into the ring, so decoding
+        # is not tied to the main loop's tick rate
+        while not self._stop.is_set():
+            seek_gen = self._seek_gen
+            timing = frame_stats.enabled
+            if timing:
+                t0 = time.perf_counter()
+            with self._player_lock:
+                frame, val = self.player.get_frame()
+            if timing and frame is not None:
+                frame_stats.add(self.name + ".get_frame", time.perf_counter() - t0)
+
+            # Is video done (can be frame or val EOF)
+            if frame == "eof" or val == "eof":
+                self._eof = True
+                self._stop.wait(0.05)
+                continue
+
+            if frame is None:
+                self._stop.wait(0.01)
+                continue
+
+            # ffpyplayer sometimes returns (img, timestamp)
+            if isinstance(frame, tuple):
+                img, pts = frame
+            else:
+                img, pts = frame, None
+
+            # frames up to the target of seek_to_second are not shown,
+            # and not waited for either; one read, the main thread can end
+            # or replace the seek meanwhile
+            target = self._seek_target
+            if target is not None and not self._reached_target(pts, target):
+                continue
+
+            try:
+                surf, target, fast = self.convert_frame(img)
+            except Exception as e:
+                print("Decode hata:", e)
+                continue
+
+            with self._ring_lock:
+                # a seek happened meanwhile, this frame is stale
+                if seek_gen == self._seek_gen:
+                    if len(self._ring) == self._ring.maxlen:
+                        self.frames_dropped += 1
+                        if timing:
+                            frame_stats.count(self.name + ".dropped")
+                    self._ring.append((img, pts, surf, target, fast))   # maxlen drops the oldest
+            notify_frame()
+
+            # val: seconds until the next frame is due, the next
+            # get_frame call hands it over on time
+            if isinstance(val, (int, float)) and val > 0:
+                self._stop.wait(min(val, 0.05))
+
+    def track_drift(self, pts):
+        # pts against the wall clock since playback (re)started; a seek,
+        # loop restart or pause starts a new reference
+        now = time.perf_counter()
+        ref = self._clock_ref
+        if pts is None or not self.playing or ref is None or ref[2] != self._seek_gen:
+            self._clock_ref = (pts, now, self._seek_gen) if pts is not None and self.playing else None
+            return
+        frame_stats.gauge(self.name + ".drift_ms", ((pts - ref[0]) - (now - ref[1])) * 1000)
+
+    def _reached_target(self, pts, target, timeout=2.0):
+        """Decode thread side of seek_to_second: frames queued before the
+        seek come first and are skipped until the keyframe shows up, then
+        frames are dropped until the target second."""
+        key, sec, started, synced = target
+        half = self.frame_duration() / 2
+
+        if pts is not None and time.time() - started < timeout:
+            if not synced:
+                if abs(pts - key) > half:
+                    return False
+                target[3] = True
+            if pts < sec - half:
+                return False
+
+        self._end_seek(target)
+        return True
+
+    def frame_duration(self):
+        if self.keyframes:
+            return self.keyframes.frame_duration()
+        return 0.04
+
+    def _end_seek(self, target=None):
+        # target reached or dropped: a panel that was decoding forward
+        # while paused stops on the current frame
+        with self._ring_lock:
+            if target is not None and self._seek_target is not target:
+                return   # a newer seek took over
+            self._seek_target = None
+        if self._muted is not None:
+            with self._player_lock:
+                if not self.playing:
+                    self.player.set_pause(True)
+                self.player.set_mute(self._muted)
+            self._muted = None
+
+    def set_loop(self, start=None, end=None):
+        # loop [start, end] while playing, no arguments turns it off
+        if start is None:
+            self.loop_range = None
+            if self.pool:
+                self.pool.pin([])
             return
 
-        img = self.frame
+        self.loop_range = (start, end)
+        if self.pool:
+            # keep a player waiting on the start, so the restart has no gap
+            self.pool.pin([start])
 
-        try:
-            w, h = img.get_size()
-            data = img.to_bytearray()[0]   # ffpyplayer -> raw RGB
-            
-            surf = pygame.image.frombuffer(data, (w, h), "RGB")
-
-            # scale as fitting in panel
-            tw, th = self.rect.size
-            aspect = w / h
-
-            if tw / th > aspect:
-                new_h = th
-                new_w = int(new_h * aspect)
+    def restart_loop(self):
+        start = self.loop_range[0]
+        warm = self.pool.take(start) if self.pool else None
+        if warm:
+            self.pool.give(self.swap_player(*warm))
+        else:
+            self.seek_to_second(start)
+
+    def swap_player(self, player, img, pts):
+        """Put a pre-warmed player that already sits on img in place of the
+        current one and return the old player, paused and muted."""
+        with self._player_lock:
+            old = self.player
+            mute = self._muted if self._muted is not None else old.get_mute()
+            self._seek_target = None
+            self._muted = None
+            old.set_pause(True)
+            old.set_mute(True)
+
+            if self._out_size:
+                player.set_size(*self._out_size)
+            player.set_mute(mute)
+            player.set_pause(not self.playing)
+            self.player = player
+            self._eof = False
+
+        self._last_seek = time.time()
+        surf, target, fast = self.convert_frame(img)
+        with self._ring_lock:
+            self._seek_gen += 1
+            self._ring.clear()
+            self._ring.append((img, pts, surf, target, fast))
+        if self.duration:
+            self.progress = pts / self.duration
+        return old
+
+    def close(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self.frames_dropped:
+            print(f"{self.name}: {self.frames_dropped} late frame(s) dropped, {self.frames_shown} shown")
+        if self._keyframe_thread:
+            self._keyframe_thread.join(timeout=1.0)
+            self._keyframe_thread = None
+        with self._player_lock:
+            # under the lock: a player still being opened sees _stop and
+            # closes itself
+            player, self.player = self.player, None
+        if player:
+            try:
+                player.close_player()
+            except:
+                pass
+
+    def fit_size(self, w, h):
+        # scale as aspect ratio and fit into pannel
+        tw, th = self.rect.size
+        aspect = w / h
+
+        if tw / th > aspect:
+            new_h = th
+            new_w = int(new_h * aspect)
+        else:
+            new_w = tw
+            new_h = int(new_w / aspect)
+
+        return new_w, new_h
+
+    def frame_target(self, w, h):
+        if (w, h) == self._out_size:
+            return self._out_size
+        return self.fit_size(w, h)
+
+    def convert_frame(self, img, smooth=None):
+        """Wrap a decoded frame in a surface at its fitted panel size.
+        Returns the surface, its size and whether it was scaled the fast
+        way (see SCALE_QUALITIES)."""
+        w, h = img.get_size()
+        target = self.frame_target(w, h)
+
+        timing = frame_stats.enabled
+        if timing:
+            t0 = time.perf_counter()
+
+        # wraps the frame memory, whoever keeps the surface keeps img too
+        data = img.to_memoryview()[0]   # ffpyplayer -> raw RGB
+        surf = pygame.image.frombuffer(data, (w, h), "RGB")
+        if timing:
+            t1 = time.perf_counter()
+            frame_stats.add(self.name + ".frombuffer", t1 - t0)
+
+        # frames already decoded at panel size are blitted as they are,
+        # only frames in flight during a resize still get scaled here
+        fast = False
+        if (w, h) != target:
+            if smooth is None:
+                smooth = self.smooth_scaling()
+            if smooth:
+                surf = pygame.transform.smoothscale(surf, target)
             else:
-                new_w = tw
-                new_h = int(new_w / aspect)
-
-            surf = pygame.transform.smoothscale(surf, (new_w, new_h))
-
-            x = self.rect.x + (tw - new_w) // 2
-            y = self.rect.y + (th - new_h) // 2
-
-            surface.blit(surf, (x, y))
-
-        except Exception as e:
-            print("Draw hata:", e)
+                surf = pygame.transform.scale(surf, target)
+                fast = True
+            if timing:
+                stage = ".smoothscale" if smooth else ".scale"
+                frame_stats.add(self.name + stage, time.perf_counter() - t1)
+        return surf, target, fast
+
+    def smooth_scaling(self):
+        # "auto": fast while playing, seeking or scrubbing
+        if self.scale_quality != "auto":
+            return self.scale_quality == "smooth"
+        if self.playing or self._seek_target is not None:
+            return False
+        return time.time() - self._last_seek >= SETTLE_TIME
+
+    def settle_frame(self):
+        # the video stopped on a fast scaled frame: one smooth pass
+        self._scaled, self._target, self._scaled_fast = self.convert_frame(self.frame, smooth=True)
+        self.invalidate(self.video_rect())
+
+    def render_frame(self):
+        """Return the scaled surface for self.frame, reusing the cache
+        while the frame and the fitted target size stay the same."""
+        img = self.frame
+        w, h = img.get_size()
+        target = self.frame_target(w, h)
+
+        if self._buf is not img or self._target != target:
+            self._scaled, self._target, self._scaled_fast = self.convert_frame(img)
+            self._buf = img
+            self._vid_size = (w, h)
+
+        return self._scaled
+
+    def video_rect(self):
+        # where the current frame is blitted, centered in the panel
+        new_w, new_h = self._target
+        tw, th = self.rect.size
+        x = self.rect.x + (tw - new_w) // 2
+        y = self.rect.y + (th - new_h) // 2
+        return pygame.Rect(x, y, new_w, new_h)
+
+    def invalidate(self, rect=None):
+        # mark a part of the panel (default: all of it) to be redrawn
+        if rect is None:
+            rect = self.rect
+        self._dirty.append(pygame.Rect(rect).clip(self.rect))
+
+    def draw(self, surface, force=False):
+        """Redraw only the parts of the panel that changed since the last
+        call and return them as dirty rects."""
+        if force:
+            regions = [self.rect]
+        else:
+            regions = self._dirty
+            if self.control_bar.changed(self):
+                regions.append(self.control_bar.area)
+        self._dirty = []
+
+        if not regions:
+            return []
+
+        surf = None
+        if self.frame is not None:
+            try:
+                surf = self.render_frame()
+                pos = self.video_rect().topleft
+            except Exception as e:
+                print("Draw hata:", e)
+
+        placeholder = None
+        if self.frame is None:
+            # until the first frame is decoded
+            text = "Video açılamadı" if self.failed else "Loading..."
+            placeholder = text_cache.render(text, (120, 120, 120), text_cache.font(None, 26))
+            placeholder_pos = placeholder.get_rect(center=self.rect.center).topleft
+
+        timing = frame_stats.enabled
+        if timing:
+            t0 = time.perf_counter()
+
+        for region in regions:
+            surface.set_clip(region)
+            surface.fill((0, 0, 0), region)
+            if surf is not None:
+                surface.blit(surf, pos)
+            elif placeholder is not None:
+                surface.blit(placeholder, placeholder_pos)
+            self.control_bar.draw(surface, self)
+        surface.set_clip(None)
 
-        self.control_bar.draw(surface, self)
+        if timing:
+            frame_stats.add(self.name + ".blit", time.perf_counter() - t0)
 
+        return regions
 
     def handle_mouse_event(self, pos, button):
         self.control_bar.handle_mouse_event(pos, button, self)
@@ -354,18 +1129,444 @@ class VideoPanel:
         return f"{h:02d}:{m:02d}:{s:02d}"
     
     def seek_to_second(self, sec):
+        if self.player and self.duration is None:
+            # a panel that has not shown a frame yet still can be seeked
+            self.duration = (self.player.get_metadata() or {}).get("duration")
         if not self.player or not self.duration:
+            if not self.failed:
+                # still opening, done from update() once it is ready
+                self._pending_seek = sec
             return
 
         sec = max(0, min(sec, self.duration))
-        ratio = sec / self.duration
-        self.set_position(ratio)
+        key = self.keyframes.before(sec) if self.keyframes else None
+        if key is None:
+            # no index (yet): plain seek, lands on a keyframe near sec
+            self.set_position(sec / self.duration)
+            return
+
+        # a seek to the keyframe is cheap and exact, the decode thread
+        # drops the frames between it and sec
+        try:
+            with self._player_lock:
+                self.player.seek(key, relative=False, accurate=False)
+                if not self.playing and self._muted is None:
+                    # a paused player decodes nothing, run it muted
+                    self._muted = self.player.get_mute()
+                    self.player.set_mute(True)
+                    self.player.set_pause(False)
+            with self._ring_lock:
+                self._seek_gen += 1
+                self._ring.clear()
+                self._seek_target = [key, sec, time.time(), False]
+            self._last_seek = time.time()
+            self.progress = sec / self.duration
+        except:
+            pass
+
+# -----------------------------------------------------------
+# Player Pool
+# -----------------------------------------------------------
+# memory budget of the pre-warmed players of one panel
+PLAYER_POOL_BYTES = 256 * 1024 * 1024
+
+
+def player_cost(src_size):
+    # rough decoder memory of one player: reference/queued frames in
+    # yuv420p plus ffmpeg's packet queue
+    w, h = src_size
+    return w * h * 3 // 2 * 16 + 15 * 1024 * 1024
+
+
+class PlayerPool:
+    """Paused players on one panel's video, pre-seeked to the intervals
+    around the selection, so selecting one of them only swaps players.
+    The number of players is capped by PLAYER_POOL_BYTES; players no
+    longer near the selection are recycled, least recently used first."""
+    def __init__(self, panel, max_bytes=PLAYER_POOL_BYTES, max_players=4):
+        self.panel = panel
+        self.max_bytes = max_bytes
+        self.max_players = max_players
+        self.capacity = None
+
+        # start second -> {"player", "frame"}, least recently used first;
+        # "frame" is (img, pts) once the player sits on it
+        self.entries = OrderedDict()
+        self.idle = []          # players not sitting on any interval
+        self.pinned = []        # always kept warm (interval loop start)
+        self._wanted = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def prepare(self, secs):
+        # warm players for these seconds, the nearest first
+        with self._lock:
+            self._wanted = list(secs)
+            for sec in self._wanted:
+                if sec in self.entries:
+                    self.entries.move_to_end(sec)
+        self._wake.set()
+
+    def pin(self, secs):
+        with self._lock:
+            self.pinned = list(secs)
+        self._wake.set()
+
+    def take(self, sec):
+        # (player, img, pts) of a player ready on sec, None otherwise
+        with self._lock:
+            entry = self.entries.get(sec)
+            if entry is None or entry["frame"] is None:
+                return None
+            del self.entries[sec]
+        return (entry["player"],) + entry["frame"]
+
+    def give(self, player):
+        # a player swapped out of the panel, kept for recycling
+        with self._lock:
+            if self.capacity is None or len(self.entries) + len(self.idle) < self.capacity:
+                self.idle.append(player)
+                player = None
+        if player is not None:
+            player.close_player()
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=5.0)
+        with self._lock:
+            players = [e["player"] for e in self.entries.values() if e["player"]] + self.idle
+            self.entries.clear()
+            self.idle = []
+        for player in players:
+            try:
+                player.close_player()
+            except:
+                pass
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(0.5)
+            self._wake.clear()
+
+            while not self._stop.is_set():
+                job = self._next_job()
+                if job is None:
+                    break
+                sec, entry = job
+
+                try:
+                    frame = self._warm(entry["player"], sec)
+                except Exception as e:
+                    print("Player pool hata:", e)
+                    frame = None
+
+                with self._lock:
+                    if self.entries.get(sec) is entry:
+                        if frame is None:
+                            del self.entries[sec]
+                            self.idle.append(entry["player"])
+                        else:
+                            entry["frame"] = frame
+                if frame is None:
+                    break
+
+    def _next_job(self):
+        # next wanted second without a player, and the player for it
+        index = self.panel.keyframes
+        if not index or not index.times or not self.panel.player:
+            # without the keyframe index a warm player can't be exact
+            return None
+
+        if self.capacity is None:
+            meta = self.panel.player.get_metadata() or {}
+            src_size = meta.get("src_vid_size") or (0, 0)
+            if not src_size[0]:
+                return None
+            budget = self.max_bytes // player_cost(src_size)
+            self.capacity = max(1, min(self.max_players, budget))
+
+        with self._lock:
+            for sec in self.pinned + self._wanted:
+                if sec in self.entries:
+                    continue
+                player = self._free_player()
+                if player is False:
+                    return None
+                # a player still to be opened keeps its slot meanwhile
+                entry = {"player": player, "frame": None}
+                self.entries[sec] = entry
+                break
+            else:
+                return None
+
+        if entry["player"] is None:
+            # opening the file is slow, take/give must not wait for it
+            player = self._open_player()
+            with self._lock:
+                # only close() drops an entry without a frame: not kept
+                # means the pool was closed during the open
+                kept = self.entries.get(sec) is entry
+                if kept and player is not None:
+                    entry["player"] = player
+                elif kept:
+                    del self.entries[sec]
+            if entry["player"] is None:
+                if player is not None:
+                    player.close_player()   # pool closed meanwhile
+                return None
+        return sec, entry
+
+    def _free_player(self):
+        # idle player, None for a new one under the cap, or the least
+        # recently used one that is not wanted any more (lock held);
+        # False when there is none
+        if self.idle:
+            return self.idle.pop()
+
+        if len(self.entries) < self.capacity:
+            return None
+
+        wanted = self.pinned + self._wanted
+        for sec, entry in self.entries.items():
+            if sec not in wanted and entry["frame"] is not None:
+                del self.entries[sec]
+                return entry["player"]
+        return False
+
+    def _open_player(self):
+        try:
+            return MediaPlayer(
+                self.panel.video_path.encode('utf-8'),
+                ff_opts=self.panel.ff_opts,
+                loglevel="quiet"
+            )
+        except Exception as e:
+            print("Video açılamadı:", self.panel.video_path, e)
+            return None
+
+    def _warm(self, player, sec, timeout=3.0):
+        # wait for the stream, decode at the panel's size, seek
+        t0 = time.time()
+        while not (player.get_metadata().get("src_vid_size") or (0, 0))[0]:
+            if time.time() - t0 > timeout or self._stop.is_set():
+                return None
+            time.sleep(0.005)
+        if self.panel._out_size:
+            player.set_size(*self.panel._out_size)
+        return seek_frame(player, self.panel.keyframes, sec, timeout=timeout)
+
+
+# -----------------------------------------------------------
+# Sessions
+# -----------------------------------------------------------
+# memory budget of the players kept open for sessions switched away from
+SESSION_BYTES = 512 * 1024 * 1024
+
+# VideoApp attributes that belong to the open pair; they are moved into
+# the Session when switching away and back when switching to it again
+SESSION_ATTRS = [
+    "directory", "pair", "store", "matches_path",
+    "left_panel", "right_panel", "interval_loop",
+    "film_intervals", "game_intervals", "match_index", "journals", "unresolved_matches",
+    "film_thumbs", "game_thumbs", "_thumb_versions", "_thumb_stop", "_thumb_threads",
+    "film_hashes", "game_hashes", "film_audio", "game_audio", "game_bounds",
+    "candidates", "candidate_offsets", "loading", "_loader",
+    "film_list", "game_list", "selected_film_idx", "selected_game_idx",
+]
+
+
+class Session:
+    """One control/reference pair the app can switch to. Nothing is opened
+    until it is selected; after switching away its paused players and
+    interval data stay in `state`, until the warm sessions go over
+    SESSION_BYTES."""
+    def __init__(self, directory, control, reference):
+        self.directory = directory
+        self.control = control
+        self.reference = reference
+        self.name = pair_name(control)
+        self.state = None
+
+    def label(self):
+        directory = os.path.relpath(self.directory)
+        return self.name if directory == "." else os.path.join(directory, self.name)
+
+    def cost(self):
+        # decoder memory of the parked panels' players
+        total = 0
+        for key in ("left_panel", "right_panel"):
+            player = self.state[key].player if self.state else None
+            if player:
+                size = (player.get_metadata() or {}).get("src_vid_size") or (0, 0)
+                total += player_cost(size if size[0] else (1920, 1080))
+        return total
+
+
+# -----------------------------------------------------------
+# Match Index
+# -----------------------------------------------------------
+class MatchIndex:
+    """Film <-> game match adjacency, kept as sets in both directions so
+    membership tests and degree counts are O(1)."""
+    def __init__(self):
+        self.film_to_games = {}
+        self.game_to_films = {}
+
+    def add(self, film_id, game_id):
+        games = self.film_to_games.setdefault(film_id, set())
+        if game_id in games:
+            return False
+        games.add(game_id)
+        self.game_to_films.setdefault(game_id, set()).add(film_id)
+        return True
+
+    def remove(self, film_id, game_id):
+        games = self.film_to_games.get(film_id)
+        if not games or game_id not in games:
+            return False
+        games.discard(game_id)
+        self.game_to_films[game_id].discard(film_id)
+        return True
+
+    def has(self, film_id, game_id):
+        return game_id in self.film_to_games.get(film_id, ())
+
+    def games_of(self, film_id):
+        return self.film_to_games.get(film_id, frozenset())
+
+    def films_of(self, game_id):
+        return self.game_to_films.get(game_id, frozenset())
+
+    def film_degree(self, film_id):
+        return len(self.film_to_games.get(film_id, ()))
+
+    def game_degree(self, game_id):
+        return len(self.game_to_films.get(game_id, ()))
+
+    def __len__(self):
+        return sum(len(games) for games in self.film_to_games.values())
+
+
+# -----------------------------------------------------------
+# Match Journal
+# -----------------------------------------------------------
+# a journal with more events than this, and more than twice the live
+# matches, is folded into the CSV while the app runs
+JOURNAL_COMPACT_RECORDS = 1000
+
+
+class MatchJournal:
+    """Append-only log of match (+) and unmatch (-) events on top of
+    matches.csv. Unmatching writes a tombstone line instead of rewriting
+    the CSV; compact() folds the log back into the CSV atomically."""
+    FIELDS = ["film_start", "film_end", "game_start", "game_end"]
+
+    def __init__(self, csv_path="matches.csv", journal_path=None):
+        self.csv_path = csv_path
+        self.journal_path = journal_path or csv_path + ".journal"
+        self.records = 0
+        self.sources = {}       # live match -> (file, line) it came from
+        self._file = None
+
+    def load(self):
+        """Live matches as a list of (film_start, film_end, game_start,
+        game_end) strings: the CSV with the journal replayed on top."""
+        live = OrderedDict()
+        sources = {}
+
+        if os.path.exists(self.csv_path):
+            with open(self.csv_path, "r", newline="", encoding="utf-8") as f:
+                reader = csv.DictReader(f)
+                for row in reader:
+                    key = tuple((row.get(k) or "").strip() for k in self.FIELDS)
+                    live[key] = True
+                    sources.setdefault(key, (self.csv_path, reader.line_num))
+
+        self.records = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "r", newline="", encoding="utf-8") as f:
+                for line_no, line in enumerate(f, start=1):
+                    # a line cut by a crash has no newline, ignore it
+                    if not line.endswith("\n"):
+                        continue
+                    parts = next(csv.reader([line]), [])
+                    if len(parts) != 5 or parts[0] not in ("+", "-"):
+                        continue
+
+                    key = tuple(p.strip() for p in parts[1:])
+                    if parts[0] == "+":
+                        if key not in live:
+                            sources[key] = (self.journal_path, line_no)
+                        live[key] = True
+                    else:
+                        live.pop(key, None)
+                        sources.pop(key, None)
+                    self.records += 1
+
+        self.sources = sources
+        return list(live)
+
+    def append(self, op, key):
+        if self._file is None:
+            self._file = open(self.journal_path, "a+", newline="", encoding="utf-8")
+            # terminate a line left half-written by a crash
+            if self._file.tell() > 0:
+                self._file.seek(self._file.tell() - 1)
+                last = self._file.read(1)
+                if last != "\n":
+                    self._file.write("\n")
+
+        csv.writer(self._file).writerow([op, *key])
+        self._file.flush()
+        self.records += 1
+
+    def add(self, key):
+        self.append("+", key)
+
+    def remove(self, key):
+        self.append("-", key)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def outgrown(self, live):
+        # replaying the journal costs more than rewriting the CSV once
+        return self.records > max(JOURNAL_COMPACT_RECORDS, 2 * live)
+
+    def compact(self):
+        """Write the live matches to the CSV (temp file + os.replace, so the
+        CSV is never half-written) and drop the journal."""
+        self.close()
+        if not os.path.exists(self.journal_path):
+            return
+
+        keys = self.load()
+        tmp_path = self.csv_path + ".tmp"
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(self.FIELDS)
+            writer.writerows(keys)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, self.csv_path)
+        # replaying the journal again is harmless, so a crash here loses nothing
+        os.remove(self.journal_path)
+        self.records = 0
+
 
 # -----------------------------------------------------------
 # Main Application
 # -----------------------------------------------------------
 class VideoApp:
-    def __init__(self):
+    def __init__(self, root="."):
+        t0 = time.time()
         info = pygame.display.Info()
         self.W = max(800, info.current_w)
         self.H = max(600, info.current_h)
@@ -373,38 +1574,59 @@ class VideoApp:
         self.screen = pygame.display.set_mode((self.W, self.H), pygame.RESIZABLE)
         pygame.display.set_caption("Film - Game Scene Matching")
 
-        self.font = pygame.font.SysFont(None, 26)
-        self.small_font = pygame.font.SysFont(None, 22)
-        self.clock = pygame.time.Clock()
+        self.font = text_cache.font(None, 26)
+        self.small_font = text_cache.font(None, 22)
+        self.pacer = FramePacer()
         self.running = True
 
+        # first frame (and resize / expose) repaints the whole window,
+        # afterwards only the changed regions are pushed
+        self.full_redraw = True
+        self.lists_dirty = True
+        self._stats_version = None
+        self._stats_h = None
+
         # ---------------------------------------------------
         # Layout
         # ---------------------------------------------------
-        self.video_area_w = int(self.W * 0.75)
-        self.list_area_w = self.W - self.video_area_w
+        self.compute_layout()
 
-        self.single_video_w = self.video_area_w // 2
+        # ---------------------------------------------------
+        # Sessions (every control/reference pair under root)
+        # ---------------------------------------------------
+        self.sessions = [Session(*pair) for pair in find_pairs(root)]
+        self.session = None
+        self.warm_sessions = []     # parked sessions, least recently used first
+        self.session_menu = False
+        self.session_list = ScrollList(0, 0, 0, 0)
+        self.session_list.set_items(self.sessions)
+        self.layout_session_menu()
+
+        if not self.sessions:
+            raise SystemExit("No control_*/reference_* video pair found under " + os.path.abspath(root))
+        self.switch_session(self.sessions[0], t0)
 
+    # ---------------------------------------------------
+    # Sessions
+    # ---------------------------------------------------
+    def open_session(self, session):
+        """Open the players and interval data of a pair that has no warm
+        state yet."""
         # ---------------------------------------------------
         # Videos
         # ---------------------------------------------------
-        video_extensions = ["mp4", "mov", "avi", "mkv"]
-        v1, v2 = [], []
-
-        for ext in video_extensions:
-            v1.extend(glob.glob(f"control_*.{ext}"))
-            v2.extend(glob.glob(f"reference_*.{ext}"))
-
-        video1 = os.path.normpath(v1[0])
-        video2 = os.path.normpath(v2[0])
+        video1 = os.path.normpath(session.control)
+        video2 = os.path.normpath(session.reference)
+        self.directory = session.directory
 
         self.left_panel = VideoPanel(
             0, 0,
             self.single_video_w,
             self.H,
             video1,
-            audio=True
+            audio=True,
+            name="film",
+            scale_quality=PANEL_SCALE_QUALITY["film"]
         )
 
         self.right_panel = VideoPanel(
@@ -413,29 +1635,38 @@ class VideoApp:
             self.H,
             video2,
             audio=False,
-            loop=True
+            loop=True,
+            name="game",
+            scale_quality=PANEL_SCALE_QUALITY["game"]
         )
 
-        # ---------------------------------------------------
-        # CSV
-        # ---------------------------------------------------
-        self.film_intervals = self.load_csv("film.csv")
-        self.game_intervals = self.load_csv("game.csv")
-
-        # add an id to each interval for easier reference and matching
-        for i, it in enumerate(self.film_intervals):
-            it["id"] = i
-            it["matched"] = False
+        self.open_pools()
 
-        for i, it in enumerate(self.game_intervals):
-            it["id"] = i
-            it["matched"] = False
+        # L: each panel loops its selected interval
+        self.interval_loop = False
 
         # ---------------------------------------------------
-        # Matrix
+        # Interval data, empty until load_session_data() is done
         # ---------------------------------------------------
-        # film_id -> [game_id, game_id, ...]
-        self.match_matrix = {it["id"]: [] for it in self.film_intervals}
+        self.store = None
+        self.pair = session.name
+        self.matches_path = os.path.join(self.directory, MATCHES_FILE)
+        self.film_intervals = []
+        self.game_intervals = []
+        self.match_index = MatchIndex()
+        self.journals = {}
+        self.unresolved_matches = []
+
+        self.film_thumbs = self.game_thumbs = None
+        self._thumb_versions = None
+        self._thumb_stop = threading.Event()
+        self._thumb_threads = []
+
+        self.film_hashes = self.game_hashes = None
+        self.film_audio = self.game_audio = None
+        self.game_bounds = []
+        self.candidates = (None, [])     # film idx -> closest game idxs
+        self.candidate_offsets = {}      # game idx -> audio offset in seconds
 
         # ---------------------------------------------------
         # Lists
@@ -453,42 +1684,291 @@ class VideoApp:
             col_w, self.H - 70
         )
 
-        self.film_list.set_items(self.film_intervals)
-        self.game_list.set_items(self.game_intervals)
-
         # selected indexler
         self.selected_film_idx = None
         self.selected_game_idx = None
 
-        # Load existing matchings from CSV to RAM
-        self.load_matches_csv()
+        self.loading = True
+        self._loader = threading.Thread(target=self.load_session_data, args=(video1, video2), daemon=True)
+        self._loader.start()
 
-    def load_matches_csv(self, path="matches.csv"):
-        if not os.path.exists(path):
+    def load_session_data(self, video1, video2):
+        """Intervals, matches, thumbnails and suggestions of the open pair,
+        read in the background while the window is already up. The app
+        leaves them alone until self.loading is cleared."""
+        try:
+            # ---------------------------------------------------
+            # CSV (or the optional project file)
+            # ---------------------------------------------------
+            self.store = ProjectStore.open_if_exists(os.path.join(self.directory, PROJECT_FILE), check_same_thread=False)
+
+            if self.store:
+                self.film_intervals = self.store.load_intervals(self.pair, "film")
+                self.game_intervals = self.store.load_intervals(self.pair, "game")
+            else:
+                self.film_intervals = self.load_csv(os.path.join(self.directory, "film.csv"))
+                self.game_intervals = self.load_csv(os.path.join(self.directory, "game.csv"))
+
+            # add an id to each interval for easier reference and matching
+            for i, it in enumerate(self.film_intervals):
+                it["id"] = i
+                it["matched"] = False
+
+            for i, it in enumerate(self.game_intervals):
+                it["id"] = i
+                it["matched"] = False
+
+            # ---------------------------------------------------
+            # Thumbnails (decoded in the background, cached beside the videos)
+            # ---------------------------------------------------
+            self.film_thumbs = self.open_thumbnails(video1, self.film_intervals)
+            self.game_thumbs = self.open_thumbnails(video2, self.game_intervals)
+            for cache in (self.film_thumbs, self.game_thumbs):
+                if cache and cache.missing():
+                    t = threading.Thread(target=build_thumbnails, args=(cache, self._thumb_stop, 0.02), daemon=True)
+                    t.start()
+                    self._thumb_threads.append(t)
+
+            # ---------------------------------------------------
+            # Similar game intervals (hashes from SimilarityIndex.py)
+            # ---------------------------------------------------
+            self.film_hashes = self.open_hashes(video1, self.film_intervals)
+            self.game_hashes = self.open_hashes(video2, self.game_intervals)
+
+            # shared audio (fingerprints from AudioFingerprint.py)
+            self.film_audio = AudioFingerprints.load(video1)
+            self.game_audio = AudioFingerprints.load(video2)
+            self.game_bounds = [(it["start"], it["end"]) for it in self.game_intervals]
+
+            # Load existing matchings from the project file or CSV (+ journal) to RAM
+            if self.store:
+                self.load_store_matches()
+            else:
+                self.load_matches_csv(self.matches_path)
+
+            self.film_list.set_items(self.film_intervals)
+            self.game_list.set_items(self.game_intervals)
+        except Exception as e:
+            print("Session data could not be loaded:", self.directory, e)
+        finally:
+            self.loading = False
+            self.lists_dirty = True
+
+    def open_pools(self):
+        # paused players waiting on the intervals around the selection
+        self.film_pool = PlayerPool(self.left_panel)
+        self.game_pool = PlayerPool(self.right_panel)
+        self.left_panel.pool = self.film_pool
+        self.right_panel.pool = self.game_pool
+
+    def park_session(self):
+        # pause the open pair and move its state into its Session; the
+        # pools' extra players are closed, the two panel players stay
+        self._loader.join()
+        for panel in (self.left_panel, self.right_panel):
+            if panel.playing:
+                panel.toggle()
+        for pool in (self.film_pool, self.game_pool):
+            if pool:
+                pool.close()
+        self.film_pool = self.game_pool = None
+
+        self.session.state = {key: getattr(self, key) for key in SESSION_ATTRS}
+        self.warm_sessions.append(self.session)
+
+    def switch_session(self, session, t0=None):
+        if session is self.session:
+            return
+        t0 = t0 or time.time()
+        if self.session:
+            self.park_session()
+
+        if session.state:
+            # warm: the paused players and the loaded data are put back
+            for key, value in session.state.items():
+                setattr(self, key, value)
+            session.state = None
+            self.warm_sessions.remove(session)
+            self.open_pools()
+            self.resize(self.W, self.H)
+        else:
+            self.open_session(session)
+            self.resize(self.W, self.H)
+
+        self.session = session
+        self.trim_sessions()
+        pygame.display.set_caption("Film - Game Scene Matching - " + session.label())
+        self.full_redraw = True
+        self.lists_dirty = True
+
+        # seconds from t0 to the window, the intervals and the first frames
+        self.open_times = {}
+        self._open_t0 = t0
+
+    def check_open_times(self):
+        """Report once how long the open pair took to become interactive:
+        window drawn, intervals loaded and a frame in both panels."""
+        if self._open_t0 is None:
+            return
+        now = time.time() - self._open_t0
+        times = self.open_times
+        if "intervals" not in times and not self.loading:
+            times["intervals"] = now
+        if "frames" not in times and all(p.frame is not None or p.failed for p in (self.left_panel, self.right_panel)):
+            times["frames"] = now
+        if len(times) < 3:
             return
 
-        with open(path, "r", newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                # Convert the times in the CSV to seconds
-                film_start = self.parse_time(row["film_start"])
-                film_end = self.parse_time(row["film_end"])
-                game_start = self.parse_time(row["game_start"])
-                game_end = self.parse_time(row["game_end"])
+        times["interactive"] = max(times.values())
+        self._open_t0 = None
+        print(
+            f"{self.session.label()}: window {times['window']:.2f}s, intervals {times['intervals']:.2f}s, "
+            f"first frames {times['frames']:.2f}s -> interactive after {times['interactive']:.2f}s"
+        )
+
+    def trim_sessions(self):
+        # close the least recently used parked sessions over the budget
+        while self.warm_sessions and sum(s.cost() for s in self.warm_sessions) > SESSION_BYTES:
+            session = self.warm_sessions.pop(0)
+            self.close_session(session.state)
+            session.state = None
+
+    def close_session(self, state):
+        for panel in (state["left_panel"], state["right_panel"]):
+            panel.close()
+
+        state["_thumb_stop"].set()
+        for t in state["_thumb_threads"]:
+            t.join(timeout=5.0)
+        for cache in (state["film_thumbs"], state["game_thumbs"]):
+            if cache:
+                cache.close()
+
+        # fold match/unmatch events back into the CSV files
+        for journal in state["journals"].values():
+            try:
+                journal.compact()
+            except Exception as e:
+                print("Journal compaction failed:", journal.journal_path, e)
+
+        if state["store"]:
+            state["store"].close()
+
+    def layout_session_menu(self):
+        # pair list over the video area
+        w = min(600, self.video_area_w - 40)
+        h = min(len(self.sessions) * 28 + 8, self.H - 120)
+        self.session_list.rect = pygame.Rect((self.video_area_w - w) // 2, 60, w, max(36, h))
+        self.session_list.scroll(0)
+
+    def toggle_session_menu(self):
+        self.session_menu = not self.session_menu
+        if self.session_menu and self.session in self.sessions:
+            idx = self.sessions.index(self.session)
+            start, visible = self.session_list.visible_range()
+            if not start <= idx < start + visible:
+                self.session_list.scroll_to_index(idx)
+        self.full_redraw = True
+
+    # ---------------------------------------------------
+    # Layout
+    # ---------------------------------------------------
+    def compute_layout(self):
+        self.video_area_w = int(self.W * 0.75)
+        self.list_area_w = self.W - self.video_area_w
 
-                # find film_item and game_item
-                film_item = next((it for it in self.film_intervals if it["start"] == film_start and it["end"] == film_end), None)
-                game_item = next((it for it in self.game_intervals if it["start"] == game_start and it["end"] == game_end), None)
+        self.single_video_w = self.video_area_w // 2
 
-                if film_item and game_item:
-                    film_id = film_item["id"]
-                    game_id = game_item["id"]
+    def resize(self, w, h):
+        # window resized: recompute layout and reconfigure players output size
+        self.W, self.H = max(800, w), max(600, h)
+        self.screen = pygame.display.get_surface()
+        self.compute_layout()
 
-                    if game_id not in self.match_matrix[film_id]:
-                        self.match_matrix[film_id].append(game_id)
+        self.left_panel.set_rect(0, 0, self.single_video_w, self.H)
+        self.right_panel.set_rect(self.single_video_w, 0, self.single_video_w, self.H)
+
+        right_x = self.video_area_w
+        col_w = (self.list_area_w - 30) // 2
+
+        self.film_list.rect = pygame.Rect(right_x + 10, 60, col_w, self.H - 70)
+        self.game_list.rect = pygame.Rect(right_x + 20 + col_w, 60, col_w, self.H - 70)
+        self.film_list.scroll(0)
+        self.game_list.scroll(0)
+        self.layout_session_menu()
+        self.full_redraw = True
+
+    def load_matches_csv(self, path=MATCHES_FILE):
+        self.unresolved_matches = []
+        if not os.path.exists(path):
+            return
 
-                    film_item["matched"] = True
-                    game_item["matched"] = True
+        # (start, end) -> interval, built once instead of scanning per row
+        film_index = self.build_interval_index(self.film_intervals)
+        game_index = self.build_interval_index(self.game_intervals)
+
+        # CSV rows with the journal (if a previous run crashed) replayed
+        journal = self.match_journal(path)
+        rows = journal.load()
+
+        for row in rows:
+            fs, fe, gs, ge = row
+            # Convert the times in the CSV to seconds
+            try:
+                film_key = (self.parse_time(fs), self.parse_time(fe))
+                game_key = (self.parse_time(gs), self.parse_time(ge))
+            except ValueError:
+                self.unresolved_matches.append((journal.sources[row], row))
+                continue
+
+            # find film_item and game_item
+            film_item = film_index.get(film_key)
+            game_item = game_index.get(game_key)
+
+            if film_item is None or game_item is None:
+                self.unresolved_matches.append((journal.sources[row], row))
+                continue
+
+            film_id = film_item["id"]
+            game_id = game_item["id"]
+
+            self.match_index.add(film_id, game_id)
+
+            film_item["matched"] = True
+            game_item["matched"] = True
+
+        if self.unresolved_matches:
+            print(f"{len(self.unresolved_matches)} match(es) in {path} do not resolve to film/game intervals:")
+            for (source, line_no), row in self.unresolved_matches[:20]:
+                print(f"  {os.path.basename(source)} line {line_no}:", ",".join(row))
+            if len(self.unresolved_matches) > 20:
+                print("  ...")
+
+    def load_store_matches(self):
+        self.unresolved_matches = []
+
+        # matches reference intervals by their row id in the project file
+        film_by_db = {it["db_id"]: it for it in self.film_intervals}
+        game_by_db = {it["db_id"]: it for it in self.game_intervals}
+
+        for film_db_id, game_db_id in self.store.load_matches(self.pair):
+            film_item = film_by_db.get(film_db_id)
+            game_item = game_by_db.get(game_db_id)
+            if film_item is None or game_item is None:
+                self.unresolved_matches.append((film_db_id, game_db_id))
+                continue
+
+            self.match_index.add(film_item["id"], game_item["id"])
+
+            film_item["matched"] = True
+            game_item["matched"] = True
+
+    def build_interval_index(self, intervals):
+        # first interval wins for duplicated bounds, like the old next() scan
+        index = {}
+        for it in intervals:
+            index.setdefault((it["start"], it["end"]), it)
+        return index
 
     # ---------------------------------------------------
     # CSV helpers
@@ -522,27 +2002,131 @@ class VideoApp:
     # ---------------------------------------------------
     def run(self):
         while self.running:
-            self.handle_events()
+            if not frame_stats.enabled:
+                self.handle_events(self.wait())
+                self.update()
+                self.draw()
+                continue
+
+            t0 = time.perf_counter()
+            first = self.wait()
+            t1 = time.perf_counter()
+            self.handle_events(first)
+            t2 = time.perf_counter()
             self.update()
+            t3 = time.perf_counter()
             self.draw()
-            self.clock.tick(30)
+            t4 = time.perf_counter()
+
+            frame_stats.add("wait", t1 - t0)
+            frame_stats.add("events", t2 - t1)
+            frame_stats.add("update", t3 - t2)
+            frame_stats.add("draw", t4 - t3)
+            frame_stats.roll()
+        frame_stats.close()
+        self.park_session()
+        for session in self.warm_sessions:
+            self.close_session(session.state)
+            session.state = None
+        self.warm_sessions = []
         pygame.quit()
 
-    def handle_events(self):
-        for e in pygame.event.get():
+    def is_idle(self):
+        # nothing can change on screen without input: both panels paused
+        # and no seek, first frame, smooth pass or data load under way
+        for panel in (self.left_panel, self.right_panel):
+            if panel.playing or panel._seek_target is not None or panel._pending_seek is not None:
+                return False
+            if panel._scaled_fast:
+                return False
+        return not self.loading and self._open_t0 is None
+
+    def wait(self):
+        """Until the next loop pass: paced by the frames while anything
+        plays, otherwise blocked on input. Returns the event that ended an
+        idle wait, it is handled first."""
+        if not self.is_idle():
+            self.pacer.wait()
+            return None
+
+        idle_waiting.set()
+        if frame_ready.is_set():
+            # a frame came in since the last pass
+            idle_waiting.clear()
+            frame_ready.clear()
+            return None
+        e = pygame.event.wait(IDLE_TIMEOUT_MS)
+        idle_waiting.clear()
+        frame_ready.clear()
+        return e if e.type != pygame.NOEVENT else None
+
+    def open_hashes(self, video_path, intervals):
+        index = HashIndex.load(video_path)
+        if index is None:
+            return None
+        return index.aligned([(it["start"], it["end"]) for it in intervals])
+
+    def open_thumbnails(self, video_path, intervals):
+        try:
+            return ThumbnailCache(video_path, [(it["start"], it["end"]) for it in intervals])
+        except Exception as e:
+            print("Thumbnail cache could not be opened:", video_path, e)
+            return None
+
+    def handle_events(self, first=None):
+        events = pygame.event.get()
+        if first is not None:
+            events.insert(0, first)
+
+        for e in events:
             if e.type == pygame.QUIT:
                 self.running = False
 
+            elif e.type == pygame.VIDEORESIZE:
+                self.resize(e.w, e.h)
+
+            elif e.type == pygame.VIDEOEXPOSE:
+                self.full_redraw = True
+
             elif e.type == pygame.KEYDOWN:
-                if e.key == pygame.K_ESCAPE:
+                if self.session_menu and e.key in (pygame.K_ESCAPE, pygame.K_TAB):
+                    self.toggle_session_menu()
+
+                elif e.key == pygame.K_ESCAPE:
                     self.running = False
 
+                # TAB: list of the video pairs to switch to
+                elif e.key == pygame.K_TAB:
+                    self.toggle_session_menu()
+
                 elif e.key == pygame.K_x:
                     self.match_selected()
                 
                 elif e.key == pygame.K_c:
                     self.unmatch_selected_pair()
 
+                elif e.key in (pygame.K_PAGEUP, pygame.K_PAGEDOWN, pygame.K_HOME, pygame.K_END):
+                    self.page_lists(e.key)
+
+                elif e.key == pygame.K_l:
+                    self.toggle_interval_loop()
+
+                # F3: frame timing overlay (and metrics file)
+                elif e.key == pygame.K_F3:
+                    frame_stats.toggle()
+                    self._stats_version = None
+                    self._stats_h = None
+                    self.full_redraw = True
+
+                # J: jump both lists to the interval at the current video time
+                elif e.key == pygame.K_j:
+                    self.film_list.jump_to_time(self.left_panel.get_current_time())
+                    self.game_list.jump_to_time(self.right_panel.get_current_time())
+                    self.lists_dirty = True
+
+            elif e.type == pygame.MOUSEBUTTONDOWN and self.session_menu:
+                self.handle_session_click(e.pos, e.button)
+
             elif e.type == pygame.MOUSEBUTTONDOWN:
                 self.left_panel.handle_mouse_event(e.pos, e.button)
                 self.right_panel.handle_mouse_event(e.pos, e.button)
@@ -552,38 +2136,122 @@ class VideoApp:
                 if e.button == 4:
                     self.film_list.scroll(-28)
                     self.game_list.scroll(-28)
+                    self.lists_dirty = True
                 elif e.button == 5:
                     self.film_list.scroll(28)
                     self.game_list.scroll(28)
+                    self.lists_dirty = True
+
+    def handle_session_click(self, pos, button):
+        if button == 4:
+            self.session_list.scroll(-28)
+        elif button == 5:
+            self.session_list.scroll(28)
+        elif button == 1:
+            idx = self.session_list.index_at(pos)
+            self.session_menu = False
+            if idx is not None:
+                self.switch_session(self.sessions[idx])
+        self.full_redraw = True
 
     # ---------------------------------------------------
     # Selection & Matching
     # ---------------------------------------------------
     def handle_list_click(self, pos):
+        if self.loading:
+            return
         film_idx = self.get_clicked_index(self.film_list, pos)
         game_idx = self.get_clicked_index(self.game_list, pos)
 
+        if film_idx is not None or game_idx is not None:
+            self.lists_dirty = True
+
         if film_idx is not None:
             self.selected_film_idx = film_idx
-
-            film_item = self.film_intervals[film_idx]
-            self.left_panel.seek_to_second(film_item["start"])
+            self.seek_interval(self.left_panel, self.film_pool, self.film_intervals, film_idx)
+            self.find_candidates(film_idx)
 
         if game_idx is not None:
             self.selected_game_idx = game_idx
-
-            game_item = self.game_intervals[game_idx]
-            self.right_panel.seek_to_second(game_item["start"])
+            self.seek_interval(self.right_panel, self.game_pool, self.game_intervals, game_idx)
+
+    def seek_interval(self, panel, pool, intervals, idx, around=2):
+        # a pre-warmed player already on the interval start is swapped in,
+        # otherwise the panel's own player seeks
+        start = intervals[idx]["start"]
+        if self.interval_loop:
+            panel.set_loop(start, intervals[idx]["end"])
+        warm = pool.take(start) if pool else None
+        if warm:
+            pool.give(panel.swap_player(*warm))
+        else:
+            panel.seek_to_second(start)
+
+        if pool:
+            # next ones first, walking down the list is the common case
+            order = [idx + d for k in range(1, around + 1) for d in (k, -k)]
+            pool.prepare([intervals[i]["start"] for i in order if 0 <= i < len(intervals)])
+
+    def toggle_interval_loop(self):
+        self.interval_loop = not self.interval_loop
+        selections = [
+            (self.left_panel, self.film_pool, self.film_intervals, self.selected_film_idx),
+            (self.right_panel, self.game_pool, self.game_intervals, self.selected_game_idx),
+        ]
+        for panel, pool, intervals, idx in selections:
+            if not self.interval_loop:
+                panel.set_loop()
+            elif idx is not None:
+                self.seek_interval(panel, pool, intervals, idx)
+        print("Interval loop:", "on" if self.interval_loop else "off")
+
+    def find_candidates(self, film_idx):
+        """Game intervals that sound (audio fingerprint) or look (perceptual
+        hash) like the film interval, audio matches first. The best one is
+        scrolled into view."""
+        best = []
+        self.candidate_offsets = {}
+
+        if self.film_audio is not None and self.game_audio is not None:
+            film_item = self.film_intervals[film_idx]
+            bounds = (film_item["start"], film_item["end"])
+            for game_idx, votes, offset in match_interval(self.film_audio, bounds, self.game_audio, self.game_bounds, TOP_K):
+                best.append(game_idx)
+                self.candidate_offsets[game_idx] = offset
+
+        if self.film_hashes is not None and self.game_hashes is not None and self.film_hashes.valid[film_idx]:
+            for game_idx in self.game_hashes.top(self.film_hashes.hashes[film_idx], TOP_K):
+                if game_idx not in best:
+                    best.append(game_idx)
+
+        best = best[:TOP_K]
+        self.candidates = (film_idx, best)
+        if best:
+            start, visible = self.game_list.visible_range()
+            if not start <= best[0] < start + visible:
+                self.game_list.scroll_to_index(best[0])
 
     def get_clicked_index(self, scroll_list, pos):
-        if not scroll_list.rect.collidepoint(pos):
-            return None
-
-        rel_y = pos[1] - scroll_list.rect.y + scroll_list.scroll_offset
-        idx = rel_y // scroll_list.item_height
-        if 0 <= idx < len(scroll_list.items):
-            return idx
-        return None
+        return scroll_list.index_at(pos)
+
+    def page_lists(self, key):
+        # page the list under the mouse, or both when the mouse is elsewhere
+        pos = pygame.mouse.get_pos()
+        lists = [l for l in (self.film_list, self.game_list) if l.rect.collidepoint(pos)]
+        if not lists:
+            lists = [self.film_list, self.game_list]
+
+        for scroll_list in lists:
+            if key == pygame.K_PAGEUP:
+                scroll_list.page(-1)
+            elif key == pygame.K_PAGEDOWN:
+                scroll_list.page(1)
+            elif key == pygame.K_HOME:
+                scroll_list.scroll_to_index(0)
+            elif key == pygame.K_END:
+                scroll_list.scroll_to_index(len(scroll_list.items))
+
+        self.lists_dirty = True
 
     def match_selected(self):
         if self.selected_film_idx is None or self.selected_game_idx is None:
@@ -595,23 +2263,35 @@ class VideoApp:
         film_id = film_item["id"]
         game_id = game_item["id"]
 
-        if game_id not in self.match_matrix[film_id]:
-            self.match_matrix[film_id].append(game_id)
+        # a pair that is matched already is not recorded a second time
+        if not self.match_index.has(film_id, game_id):
+            self.match_index.add(film_id, game_id)
 
-        film_item["matched"] = True
-        game_item["matched"] = True
+            film_item["matched"] = True
+            game_item["matched"] = True
 
-        self.append_match_csv(film_item, game_item)
+            if self.store:
+                self.store.add_match(film_item["db_id"], game_item["db_id"])
+            else:
+                self.append_match_csv(film_item, game_item, self.matches_path)
 
         self.film_list.set_items(self.film_intervals)
         self.game_list.set_items(self.game_intervals)
 
         self.selected_film_idx = None
         self.selected_game_idx = None
+        self.lists_dirty = True
 
     def update(self):
         self.left_panel.update()
         self.right_panel.update()
+        self.check_open_times()
+
+        # new thumbnails arrived from the background decoders
+        versions = tuple(c.version if c else 0 for c in (self.film_thumbs, self.game_thumbs))
+        if versions != self._thumb_versions:
+            self._thumb_versions = versions
+            self.lists_dirty = True
 
     def unmatch_selected_pair(self):
         if self.selected_film_idx is None or self.selected_game_idx is None:
@@ -623,122 +2303,235 @@ class VideoApp:
         film_id = film_item["id"]
         game_id = game_item["id"]
 
-        # delete from RAM
-        if game_id in self.match_matrix.get(film_id, []):
-            self.match_matrix[film_id].remove(game_id)
+        # no tombstone for a pair that is not matched
+        if self.match_index.has(film_id, game_id):
+            # delete from RAM, an interval stays matched while it has other matches
+            self.match_index.remove(film_id, game_id)
 
-        film_item["matched"] = False
-        game_item["matched"] = False
+            film_item["matched"] = self.match_index.film_degree(film_id) > 0
+            game_item["matched"] = self.match_index.game_degree(game_id) > 0
 
-        # delete from CSV
-        self.remove_match_csv(film_item, game_item)
+            # delete from the project file or CSV
+            if self.store:
+                self.store.remove_match(film_item["db_id"], game_item["db_id"])
+            else:
+                self.remove_match_csv(film_item, game_item, self.matches_path)
 
         self.film_list.set_items(self.film_intervals)
         self.game_list.set_items(self.game_intervals)
 
         self.selected_film_idx = None
         self.selected_game_idx = None
+        self.lists_dirty = True
 
 
     # ---------------------------------------------------
     # Draw
     # ---------------------------------------------------
     def draw(self):
-        self.screen.fill((0, 0, 0))
-
-        self.left_panel.draw(self.screen)
-        self.right_panel.draw(self.screen)
-
-        self.draw_titles()
-        self.draw_lists()
-
-        pygame.display.flip()
+        full = self.full_redraw
+        self.full_redraw = False
+        rects = []
+
+        # titles are static, only painted with the whole window
+        if full:
+            self.screen.fill((0, 0, 0))
+            self.draw_titles()
+
+        rects += self.left_panel.draw(self.screen, force=full)
+        rects += self.right_panel.draw(self.screen, force=full)
+
+        if full or self.lists_dirty:
+            self.lists_dirty = False
+            timing = frame_stats.enabled
+            if timing:
+                t0 = time.perf_counter()
+            self.draw_lists()
+            if timing:
+                frame_stats.add("lists", time.perf_counter() - t0)
+            rects += [self.film_list.rect, self.game_list.rect]
+
+        # painted over the video panels, so again whenever they were
+        if self.session_menu and (full or rects):
+            self.draw_session_menu()
+            rects.append(self.session_list.rect)
+
+        if frame_stats.enabled and (full or rects or self._stats_version != frame_stats.version):
+            rects.append(self.draw_stats_overlay())
+
+        timing = frame_stats.enabled
+        if timing:
+            t0 = time.perf_counter()
+        if full:
+            pygame.display.flip()
+            if self._open_t0 is not None and "window" not in self.open_times:
+                self.open_times["window"] = time.time() - self._open_t0
+        elif rects:
+            pygame.display.update(rects)
+        if timing:
+            frame_stats.add("flip", time.perf_counter() - t0)
 
     def draw_titles(self):
-        film_t = self.font.render("Film", True, (220, 220, 220))
-        game_t = self.font.render("Game", True, (220, 220, 220))
+        film_t = text_cache.render("Film", (220, 220, 220), self.font)
+        game_t = text_cache.render("Game", (220, 220, 220), self.font)
         self.screen.blit(film_t, (self.video_area_w + 10, 20))
         self.screen.blit(game_t, (self.video_area_w + self.list_area_w // 2, 20))
 
+    def draw_stats_overlay(self):
+        """Last second of frame timing in the top left corner of the video
+        area: ms per call and calls per second of every stage, then the
+        counters and the drift of each panel."""
+        self._stats_version = frame_stats.version
+        summary = frame_stats.last
+        lines = ["frame timing (F3)"]
+        if summary is None:
+            lines.append("measuring...")
+        else:
+            for stage, entry in sorted(summary["stages"].items()):
+                lines.append(f"{stage:18s} {entry['ms']:7.2f} ms  x{entry['calls']}")
+            for name, value in sorted(summary["counters"].items()):
+                lines.append(f"{name:18s} {value}")
+            for name, value in sorted(summary["gauges"].items()):
+                lines.append(f"{name:18s} {value:+.0f}")
+
+        font = text_cache.font("monospace", 15)
+        line_h = font.get_linesize()
+        # never shrinks while shown, a shorter summary would leave old lines
+        self._stats_h = max(self._stats_h or 0, line_h * len(lines) + 8)
+        rect = pygame.Rect(8, 8, 300, self._stats_h)
+        self.screen.fill((20, 20, 20), rect)
+        for i, line in enumerate(lines):
+            surf = text_cache.render(line, (230, 230, 120), font)
+            self.screen.blit(surf, (rect.x + 6, rect.y + 4 + i * line_h))
+        return rect
+
+    def draw_session_menu(self):
+        scroll_list = self.session_list
+        self.screen.set_clip(scroll_list.rect)
+        pygame.draw.rect(self.screen, (30, 30, 30), scroll_list.rect)
+        pygame.draw.rect(self.screen, (120, 120, 120), scroll_list.rect, 1)
+        start, visible = scroll_list.visible_range()
+        for i in range(start, min(len(self.sessions), start + visible)):
+            y = scroll_list.rect.y + (i - start) * scroll_list.item_height + 4
+            session = self.sessions[i]
+
+            color = (200, 200, 200)
+            if session.state:
+                # players still open, switches back at once
+                color = (0, 180, 0)
+            if session is self.session:
+                color = (200, 200, 0)
+
+            surf = text_cache.render(session.label(), color, self.small_font)
+            self.screen.blit(surf, (scroll_list.rect.x + 8, y))
+        self.screen.set_clip(None)
+
     def draw_lists(self):
+        if self.loading:
+            for scroll_list in (self.film_list, self.game_list):
+                self.screen.set_clip(scroll_list.rect)
+                pygame.draw.rect(self.screen, (40, 40, 40), scroll_list.rect)
+                surf = text_cache.render("Loading...", (120, 120, 120), self.small_font)
+                self.screen.blit(surf, (scroll_list.rect.x + 8, scroll_list.rect.y + 4))
+            self.screen.set_clip(None)
+            return
         self.draw_scroll_list(self.film_list, self.selected_film_idx)
         self.draw_scroll_list(self.game_list, self.selected_game_idx)
 
     def draw_scroll_list(self, scroll_list, selected_idx):
+        # rows never paint outside the list, only its rect is pushed
+        self.screen.set_clip(scroll_list.rect)
         pygame.draw.rect(self.screen, (40, 40, 40), scroll_list.rect)
-        start = scroll_list.scroll_offset // scroll_list.item_height
-        visible = scroll_list.rect.h // scroll_list.item_height
-
+        start, visible = scroll_list.visible_range()
+        x = scroll_list.rect.x + 8
+        row_h = scroll_list.item_height
+
+        # thumbnail left of the text when the list has a cache
+        thumbs = self.film_thumbs if scroll_list is self.film_list else self.game_thumbs
+        text_x = x + THUMB_SIZE[0] + 2 if thumbs else x
+
+        # ones that are connected to the selection of the other list are green
+        matched_ids = ()
+        if scroll_list is self.game_list and self.selected_film_idx is not None:
+            film_id = self.film_intervals[self.selected_film_idx]["id"]
+            matched_ids = self.match_index.games_of(film_id)
+        elif scroll_list is self.film_list and self.selected_game_idx is not None:
+            game_id = self.game_intervals[self.selected_game_idx]["id"]
+            matched_ids = self.match_index.films_of(game_id)
+
+        # closest game intervals to the selected film interval are cyan
+        candidates = ()
+        if scroll_list is self.game_list and self.selected_film_idx is not None:
+            film_idx, best = self.candidates
+            if film_idx == self.selected_film_idx:
+                candidates = best
+
+        # only the visible rows are touched
         for i in range(start, min(len(scroll_list.items), start + visible)):
-            item = scroll_list.items[i]
-            y = scroll_list.rect.y + (i - start) * scroll_list.item_height + 4
+            y = scroll_list.rect.y + (i - start) * row_h + 4
 
             color = (200, 200, 200)  # default grey
 
-            # Right list: ones that is connected to the selected film is green 
-            if scroll_list is self.game_list and self.selected_film_idx is not None:
-                film_id = self.film_intervals[self.selected_film_idx]["id"]
-                if item["id"] in self.match_matrix.get(film_id, []):
-                    color = (0, 180, 0)
+            if i in candidates:
+                color = (0, 170, 220)
+
+            if matched_ids and scroll_list.items[i]["id"] in matched_ids:
+                color = (0, 180, 0)
 
             # selected item always appears at the top (yellow)
             if i == selected_idx:
                 color = (200, 200, 0)
 
-            txt = f"{self.left_panel.format_time(item['start'])} - {self.left_panel.format_time(item['end'])}"
-            surf = self.small_font.render(txt, True, color)
-            self.screen.blit(surf, (scroll_list.rect.x + 8, y))
-    
-    def append_match_csv(self, film_item, game_item, path="matches.csv"):
-        file_exists = os.path.exists(path)
-
-        with open(path, "a", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
+            if thumbs:
+                thumb = thumbs.surface(i)
+                if thumb:
+                    self.screen.blit(thumb, (x - 4, y - 2))
 
-            if not file_exists:
-                writer.writerow([
-                    "film_start",
-                    "film_end",
-                    "game_start",
-                    "game_end"
-                ])
-
-            writer.writerow([
-                self.left_panel.format_time(film_item["start"]),
-                self.left_panel.format_time(film_item["end"]),
-                self.right_panel.format_time(game_item["start"]),
-                self.right_panel.format_time(game_item["end"])
-            ])
-
-    def remove_match_csv(self, film_item, game_item, path="matches.csv"):
-        if not os.path.exists(path):
-            return
+            txt = scroll_list.row_text(i, self.left_panel.format_time, sep=" - ")
+            if i in candidates and i in self.candidate_offsets:
+                # where the film interval starts inside this one, by audio
+                txt += f"  {self.candidate_offsets[i]:+.1f}s"
+            surf = text_cache.render(txt, color, self.small_font)
+            self.screen.blit(surf, (text_x, y))
 
-        # read CSV rows
-        with open(path, "r", newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            rows = [row for row in reader]
-
-        # use right format
-        fs = self.left_panel.format_time(film_item["start"]).strip()
-        fe = self.left_panel.format_time(film_item["end"]).strip()
-        gs = self.right_panel.format_time(game_item["start"]).strip()
-        ge = self.right_panel.format_time(game_item["end"]).strip()
-
-        # Remove the line to be deleted
-        rows = [
-            row for row in rows
-            if not (row["film_start"].strip() == fs and
-                    row["film_end"].strip() == fe and
-                    row["game_start"].strip() == gs and
-                    row["game_end"].strip() == ge)
-        ]
+        self.screen.set_clip(None)
+    
+    def match_journal(self, path):
+        journal = self.journals.get(path)
+        if journal is None:
+            journal = MatchJournal(path)
+            self.journals[path] = journal
+        return journal
+
+    def match_key(self, film_item, game_item):
+        return (
+            self.left_panel.format_time(film_item["start"]),
+            self.left_panel.format_time(film_item["end"]),
+            self.right_panel.format_time(game_item["start"]),
+            self.right_panel.format_time(game_item["end"])
+        )
 
-        # rewrite CSV
-        with open(path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=["film_start","film_end","game_start","game_end"])
-            writer.writeheader()
-            writer.writerows(rows)
+    def append_match_csv(self, film_item, game_item, path=MATCHES_FILE):
+        # one journal line, matches.csv is rewritten by compaction
+        journal = self.match_journal(path)
+        journal.add(self.match_key(film_item, game_item))
+        self.compact_if_outgrown(journal)
+
+    def remove_match_csv(self, film_item, game_item, path=MATCHES_FILE):
+        # tombstone instead of rewriting the whole CSV
+        journal = self.match_journal(path)
+        journal.remove(self.match_key(film_item, game_item))
+        self.compact_if_outgrown(journal)
+
+    def compact_if_outgrown(self, journal):
+        # a long session of match/unmatch would otherwise grow the
+        # journal, and its replay on the next start, without bound
+        if not journal.outgrown(len(self.match_index)):
+            return
+        try:
+            journal.compact()
+        except Exception as e:
+            print("Journal compaction failed:", journal.journal_path, e)
 
 
 if __name__ == "__main__":
@@ -747,7 +2540,8 @@ if __name__ == "__main__":
     screen = pygame.display.set_mode((1400, 800))
     pygame.display.set_caption("Video Interval Matcher")
 
-    app = VideoApp()
+    # python IntervalMatchingApp.py [root]  -> pairs under root (default: here)
+    app = VideoApp(sys.argv[1] if len(sys.argv) > 1 else ".")
     app.run()
 
 
@@ -0,0 +1,240 @@
+from ffpyplayer.player import MediaPlayer
+from ProjectStore import first_video
+from bisect import bisect_right
+import json
+import time
+import sys
+import os
+
+# longest keyframe interval expected from an encoder: a scan that finds a
+# single keyframe in a longer video has failed, it is not saved and the
+# video is used without an index
+MAX_GOP = 20.0
+
+# sidecars written by an older scan are scanned again
+INDEX_VERSION = 2
+
+
+# -----------------------------------------------------------
+# Keyframe Index
+# -----------------------------------------------------------
+class KeyframeIndex:
+    """Keyframe timestamps of a video, scanned once and kept in a
+    '<video>.keyframes' sidecar (invalidated by the video's mtime/size).
+    A non-accurate seek to a keyframe is both fast and exact, so a seek to
+    any second becomes: seek to before(sec), then drop decoded frames until
+    sec is reached."""
+    def __init__(self, video_path):
+        self.video_path = video_path
+        self.path = video_path + ".keyframes"
+        self.times = []
+        self.frame_rate = None
+        self.load()
+
+    def _stat(self):
+        st = os.stat(self.video_path)
+        return st.st_mtime_ns, st.st_size
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION or (data["mtime_ns"], data["size"]) != self._stat():
+                return False
+            self.frame_rate = tuple(data["frame_rate"]) if data.get("frame_rate") else None
+            self.times = data["keyframes"]
+            return True
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+    def save(self):
+        mtime_ns, size = self._stat()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": INDEX_VERSION,
+                "mtime_ns": mtime_ns,
+                "size": size,
+                "frame_rate": self.frame_rate,
+                "keyframes": self.times
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    def frame_duration(self):
+        if self.frame_rate and self.frame_rate[0]:
+            return self.frame_rate[1] / self.frame_rate[0]
+        return 0.04
+
+    def before(self, sec):
+        # last keyframe at or before sec, None without an index
+        idx = bisect_right(self.times, sec + 1e-6) - 1
+        if idx < 0:
+            return None
+        return self.times[idx]
+
+    def scan(self, stop=None, timeout=10.0):
+        """Walk the keyframes backwards from the end: a non-accurate seek to
+        t lands on the last keyframe <= t, the next probe goes just before
+        it. One seek per keyframe."""
+        player = MediaPlayer(
+            self.video_path.encode('utf-8'),
+            ff_opts={'an': 1, 'sync': 'video', 'out_fmt': 'rgb24'},
+            loglevel="quiet"
+        )
+        try:
+            t0 = time.time()
+            meta = player.get_metadata()
+            while not (meta.get("src_vid_size") or (0, 0))[0] or not meta.get("duration"):
+                if time.time() - t0 > timeout:
+                    return False
+                time.sleep(0.005)
+                meta = player.get_metadata()
+
+            # only the timestamps matter, keep the decoded frames tiny
+            player.set_size(32, -1)
+            num, den = meta.get("frame_rate") or (25, 1)
+            frame_dt = den / num if num else 0.04
+            self.frame_rate = (num, den)
+
+            # the first decoded frame, later probes tell the seek has
+            # happened from a jump against the stream before it
+            last = None
+            while last is None:
+                if time.time() - t0 > timeout:
+                    return False
+                frame, val = player.get_frame()
+                if frame is None or frame == "eof" or val == "eof":
+                    time.sleep(0.001)
+                    continue
+                last = frame[1]
+
+            keyframes = []
+            t = meta["duration"]
+            for _ in range(int(meta["duration"] / frame_dt) + 1):
+                if stop is not None and stop.is_set():
+                    return False
+
+                run = self._probe(player, t, frame_dt, last)
+                if run is None:
+                    break
+                key, last = run[0], run[-1]
+                if keyframes and key >= keyframes[-1] - frame_dt / 2:
+                    # landed on the same keyframe again, step further back
+                    t = min(t, keyframes[-1]) - frame_dt
+                else:
+                    keyframes.append(key)
+                    t = key - frame_dt / 2
+                if t < 0 or key <= frame_dt / 2:
+                    break
+
+            keyframes.reverse()
+            if not keyframes or keyframes[0] > frame_dt / 2:
+                keyframes.insert(0, 0.0)
+
+            if len(keyframes) == 1 and meta["duration"] > MAX_GOP:
+                print(f"{self.video_path}: keyframe scan failed ({len(keyframes)} keyframes), not saved")
+                self.times = []
+                return False
+            self.times = keyframes
+            self.save()
+            return True
+        finally:
+            player.close_player()
+
+    def _probe(self, player, t, frame_dt, last, timeout=2.0):
+        """Seek to t and return the run of frames the seek landed on, its
+        first frame is the keyframe. Frames still queued from before the
+        seek come first: they carry on from `last`, the pts read before (a
+        frame can be handed over twice), and are skipped until the pts
+        jumps."""
+        player.seek(t, relative=False, accurate=False)
+        run = None
+        t0 = time.time()
+        while time.time() - t0 < timeout:
+            frame, val = player.get_frame()
+            if frame == "eof" or val == "eof":
+                if run and run[0] <= t + frame_dt / 2:
+                    return run
+                time.sleep(0.002)
+                continue
+            if frame is None:
+                time.sleep(0.001)
+                continue
+
+            pts = frame[1]
+            if run is None:
+                if -1e-6 <= pts - last <= 1.5 * frame_dt:
+                    last = pts
+                    continue
+                run = [pts]
+            elif 0 < pts - run[-1] <= 1.5 * frame_dt:
+                run.append(pts)
+            else:
+                run = [pts]
+            if len(run) >= 3 and run[0] <= t + frame_dt / 2:
+                return run
+        return None
+
+
+def seek_frame(player, index, sec, timeout=3.0):
+    """Decode the frame shown at sec with a paused player: seek to the
+    keyframe before sec and decode forward, muted. Without an index (a
+    failed scan) the seek is an accurate one to sec. Returns (img, pts), or
+    None on timeout; the player is left paused on that frame."""
+    key = index.before(sec)
+    accurate = key is None
+    if accurate:
+        key = sec
+    half = index.frame_duration() / 2
+    # an accurate seek lands on the first frame from sec on
+    window = 2 * half if accurate else half
+
+    mute = player.get_mute()
+    player.set_mute(True)
+    player.seek(key, relative=False, accurate=accurate)
+    player.set_pause(False)
+    try:
+        synced = False
+        t0 = time.time()
+        while time.time() - t0 < timeout:
+            frame, val = player.get_frame()
+            if frame == "eof" or val == "eof":
+                time.sleep(0.002)
+                continue
+            if frame is None:
+                time.sleep(0.001)
+                continue
+
+            img, pts = frame
+            # frames queued before the seek come first
+            if not synced:
+                if abs(pts - key) > window:
+                    continue
+                synced = True
+            if pts >= sec - half:
+                return img, pts
+        return None
+    finally:
+        player.set_pause(True)
+        player.set_mute(mute)
+
+
+if __name__ == "__main__":
+    # python KeyframeIndex.py [video ...]  (default: control_*/reference_* here)
+    videos = sys.argv[1:]
+    if not videos:
+        for prefix in ["control_", "reference_"]:
+            video = first_video(".", prefix)
+            if video:
+                videos.append(os.path.normpath(video))
+
+    for video in videos:
+        index = KeyframeIndex(video)
+        if index.times:
+            print(f"{video}: up to date, {len(index.times)} keyframes")
+            continue
+        t0 = time.time()
+        index.scan()
+        print(f"{video}: {len(index.times)} keyframes, {time.time() - t0:.1f}s")
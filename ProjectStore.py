@@ -0,0 +1,300 @@
+import sqlite3
+import csv
+import sys
+import os
+
+# default project file, looked up in the working directory
+PROJECT_FILE = "project.sqlite"
+
+# side -> CSV file of the existing flat layout
+CSV_FILES = {
+    "film": "film.csv",      # IntervalMatchingApp, left video
+    "game": "game.csv",      # IntervalMatchingApp, right video
+    "output": "output.csv",  # DualAnnotationTool, control video
+}
+MATCHES_FILE = "matches.csv"
+
+VIDEO_EXTENSIONS = ["mp4", "mov", "avi", "mkv"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pairs (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS intervals (
+    id INTEGER PRIMARY KEY,
+    pair_id INTEGER NOT NULL REFERENCES pairs(id),
+    side TEXT NOT NULL,
+    start REAL NOT NULL,
+    "end" REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS intervals_by_bounds ON intervals(pair_id, side, start, "end");
+
+CREATE TABLE IF NOT EXISTS matches (
+    film_id INTEGER NOT NULL REFERENCES intervals(id) ON DELETE CASCADE,
+    game_id INTEGER NOT NULL REFERENCES intervals(id) ON DELETE CASCADE,
+    PRIMARY KEY (film_id, game_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS matches_by_game ON matches(game_id);
+"""
+
+
+def parse_time(val):
+    val = val.strip()
+    if ":" in val:
+        p = list(map(int, val.split(":")))
+        if len(p) == 3:
+            return p[0] * 3600 + p[1] * 60 + p[2]
+        return p[0] * 60 + p[1]
+    return float(val)
+
+
+def format_time(sec):
+    s = int(sec)
+    h = s // 3600
+    m = (s % 3600) // 60
+    s = s % 60
+    return f"{h:02d}:{m:02d}:{s:02d}"
+
+
+def read_interval_csv(path):
+    """start,end CSV -> list of (start, end) seconds, sorted by start."""
+    with open(path, newline="", encoding="utf-8") as f:
+        intervals = [(parse_time(r["start"]), parse_time(r["end"])) for r in csv.DictReader(f)]
+    intervals.sort()
+    return intervals
+
+
+def pair_name(control_path):
+    # a pair is named after its control video, e.g. 'control_xxxx'
+    return os.path.splitext(os.path.basename(control_path))[0]
+
+
+# -----------------------------------------------------------
+# Project Store
+# -----------------------------------------------------------
+class ProjectStore:
+    """SQLite project file holding the intervals and matches of any number
+    of video pairs. Interval lookups go through (pair, side, start, end)
+    indexes and every write is its own transaction."""
+    def __init__(self, path=PROJECT_FILE, check_same_thread=True):
+        # check_same_thread=False: opened by a loader thread and handed over
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=check_same_thread)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        self._pair_ids = {}
+
+    @classmethod
+    def open_if_exists(cls, path=PROJECT_FILE, check_same_thread=True):
+        # the project file is optional, without it the apps use the CSVs
+        if not os.path.exists(path):
+            return None
+        try:
+            return cls(path, check_same_thread)
+        except sqlite3.Error as e:
+            print("Project file could not be opened:", path, e)
+            return None
+
+    def close(self):
+        self.conn.close()
+
+    def pair_id(self, name):
+        pid = self._pair_ids.get(name)
+        if pid is None:
+            with self.conn:
+                self.conn.execute("INSERT OR IGNORE INTO pairs(name) VALUES (?)", (name,))
+            pid = self.conn.execute("SELECT id FROM pairs WHERE name = ?", (name,)).fetchone()[0]
+            self._pair_ids[name] = pid
+        return pid
+
+    # ---------------------------------------------------
+    # Intervals
+    # ---------------------------------------------------
+    def load_intervals(self, pair, side):
+        """Intervals of one side as dicts {start, end, db_id}, sorted by start."""
+        rows = self.conn.execute(
+            'SELECT id, start, "end" FROM intervals WHERE pair_id = ? AND side = ? ORDER BY start, "end"',
+            (self.pair_id(pair), side)
+        )
+        return [{"start": s, "end": e, "db_id": i} for i, s, e in rows]
+
+    def add_interval(self, pair, side, start, end):
+        with self.conn:
+            cur = self.conn.execute(
+                'INSERT INTO intervals(pair_id, side, start, "end") VALUES (?, ?, ?, ?)',
+                (self.pair_id(pair), side, start, end)
+            )
+        return cur.lastrowid
+
+    def find_interval(self, pair, side, start, end):
+        row = self.conn.execute(
+            'SELECT id FROM intervals WHERE pair_id = ? AND side = ? AND start = ? AND "end" = ? ORDER BY id LIMIT 1',
+            (self.pair_id(pair), side, start, end)
+        ).fetchone()
+        return row[0] if row else None
+
+    # ---------------------------------------------------
+    # Matches
+    # ---------------------------------------------------
+    def load_matches(self, pair):
+        """(film db_id, game db_id) pairs of one video pair."""
+        return self.conn.execute(
+            "SELECT m.film_id, m.game_id FROM matches m "
+            "JOIN intervals f ON f.id = m.film_id WHERE f.pair_id = ?",
+            (self.pair_id(pair),)
+        ).fetchall()
+
+    def add_match(self, film_id, game_id):
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO matches(film_id, game_id) VALUES (?, ?)", (film_id, game_id))
+
+    def remove_match(self, film_id, game_id):
+        with self.conn:
+            self.conn.execute("DELETE FROM matches WHERE film_id = ? AND game_id = ?", (film_id, game_id))
+
+    # ---------------------------------------------------
+    # CSV import / export
+    # ---------------------------------------------------
+    def import_csv(self, pair, side, path, force=False):
+        """Make one side's intervals those of a start,end CSV. Intervals
+        already in the project keep their ids (and matches); removing ones
+        that still have matches raises ValueError unless forced, the
+        matches go with them."""
+        pid = self.pair_id(pair)
+        existing = {}
+        for i, s, e in self.conn.execute(
+                'SELECT id, start, "end" FROM intervals WHERE pair_id = ? AND side = ? ORDER BY id', (pid, side)):
+            existing.setdefault((s, e), []).append(i)
+
+        new_rows = []
+        for bounds in read_interval_csv(path):
+            ids = existing.get(bounds)
+            if ids:
+                ids.pop(0)
+            else:
+                new_rows.append((pid, side) + bounds)
+        removed = [(i,) for ids in existing.values() for i in ids]
+
+        if removed and not force:
+            ids = [i for i, in removed]
+            marks = ",".join("?" * len(ids))
+            dropped = self.conn.execute(
+                f"SELECT COUNT(*) FROM matches WHERE film_id IN ({marks}) OR game_id IN ({marks})", ids + ids
+            ).fetchone()[0]
+            if dropped:
+                raise ValueError(f"{path}: {len(removed)} intervals not in the CSV have {dropped} matches, use force to drop them")
+
+        with self.conn:
+            self.conn.executemany("DELETE FROM intervals WHERE id = ?", removed)
+            self.conn.executemany('INSERT INTO intervals(pair_id, side, start, "end") VALUES (?, ?, ?, ?)', new_rows)
+        return len(new_rows), len(removed)
+
+    def export_csv(self, pair, side, path):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["start", "end"])
+            for it in self.load_intervals(pair, side):
+                writer.writerow([format_time(it["start"]), format_time(it["end"])])
+
+    def import_matches_csv(self, pair, path):
+        """Add the rows of a matches.csv, returns the rows that did not
+        resolve to film/game intervals."""
+        rows, unresolved = [], []
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                try:
+                    film_id = self.find_interval(pair, "film", parse_time(row["film_start"]), parse_time(row["film_end"]))
+                    game_id = self.find_interval(pair, "game", parse_time(row["game_start"]), parse_time(row["game_end"]))
+                except (KeyError, ValueError, AttributeError):
+                    film_id = game_id = None
+
+                if film_id is None or game_id is None:
+                    unresolved.append(row)
+                else:
+                    rows.append((film_id, game_id))
+
+        with self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO matches(film_id, game_id) VALUES (?, ?)", rows)
+        return unresolved
+
+    def export_matches_csv(self, pair, path):
+        rows = self.conn.execute(
+            'SELECT f.start, f."end", g.start, g."end" FROM matches m '
+            "JOIN intervals f ON f.id = m.film_id JOIN intervals g ON g.id = m.game_id "
+            "WHERE f.pair_id = ? ORDER BY f.start, g.start",
+            (self.pair_id(pair),)
+        )
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["film_start", "film_end", "game_start", "game_end"])
+            for fs, fe, gs, ge in rows:
+                writer.writerow([format_time(fs), format_time(fe), format_time(gs), format_time(ge)])
+
+
+def first_video(directory, prefix):
+    # the one rule for picking a pair's videos: first control_*/reference_*
+    # with a video extension, by name
+    names = sorted(
+        name for name in os.listdir(directory)
+        if name.startswith(prefix) and name.rsplit(".", 1)[-1].lower() in VIDEO_EXTENSIONS
+    )
+    return os.path.join(directory, names[0]) if names else None
+
+
+def find_pair_name(directory="."):
+    control = first_video(directory, "control_")
+    return pair_name(control) if control else None
+
+
+def find_pairs(root):
+    """Directories under root holding a control_* and a reference_* video,
+    as (directory, control video, reference video)."""
+    pairs = []
+    for directory, dirs, files in os.walk(root):
+        dirs.sort()
+        control = first_video(directory, "control_")
+        reference = first_video(directory, "reference_")
+        if control and reference:
+            pairs.append((directory, control, reference))
+    return pairs
+
+
+if __name__ == "__main__":
+    # python ProjectStore.py import|export [project.sqlite] [--force]
+    args = [a for a in sys.argv[1:] if a != "--force"]
+    force = "--force" in sys.argv
+    if not args or args[0] not in ("import", "export"):
+        print("Usage: python ProjectStore.py import|export [project.sqlite] [--force]")
+        sys.exit(1)
+
+    db_path = args[1] if len(args) >= 2 else PROJECT_FILE
+    name = find_pair_name()
+    if name is None:
+        raise FileNotFoundError("control_ videosu bulunamadı.")
+
+    store = ProjectStore(db_path)
+    try:
+        if args[0] == "import":
+            for side, csv_path in CSV_FILES.items():
+                if os.path.exists(csv_path):
+                    try:
+                        added, removed = store.import_csv(name, side, csv_path, force)
+                        print(f"{csv_path}: {added} intervals added, {removed} removed")
+                    except ValueError as e:
+                        print("skipped:", e)
+            if os.path.exists(MATCHES_FILE):
+                unresolved = store.import_matches_csv(name, MATCHES_FILE)
+                print(f"{MATCHES_FILE}: imported, {len(unresolved)} unresolved rows")
+        else:
+            for side, csv_path in CSV_FILES.items():
+                if store.load_intervals(name, side):
+                    store.export_csv(name, side, csv_path)
+                    print("written:", csv_path)
+            store.export_matches_csv(name, MATCHES_FILE)
+            print("written:", MATCHES_FILE)
+    finally:
+        store.close()
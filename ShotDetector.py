@@ -0,0 +1,234 @@
+from ffpyplayer.player import MediaPlayer
+from ProjectStore import format_time, first_video
+from multiprocessing import Pool
+import numpy as np
+import argparse
+import time
+import csv
+import os
+
+# width frames are decoded at, height follows the aspect ratio
+DETECT_WIDTH = 64
+
+# video prefix -> CSV it produces, same pairing as the apps
+OUTPUTS = [("control_", "film.csv"), ("reference_", "game.csv")]
+
+
+# -----------------------------------------------------------
+# Decoding (runs in the worker processes)
+# -----------------------------------------------------------
+def open_player(video_path, width=DETECT_WIDTH, timeout=10.0):
+    player = MediaPlayer(
+        video_path.encode('utf-8'),
+        ff_opts={'an': 1, 'sync': 'video', 'framedrop': False, 'out_fmt': 'rgb24'},
+        loglevel="quiet"
+    )
+    t0 = time.time()
+    meta = player.get_metadata()
+    while not (meta.get("src_vid_size") or (0, 0))[0] or not meta.get("duration"):
+        if time.time() - t0 > timeout:
+            player.close_player()
+            raise RuntimeError("Video açılamadı: " + video_path)
+        time.sleep(0.005)
+        meta = player.get_metadata()
+    player.set_size(width, -1)
+    return player, meta
+
+
+def frame_array(img):
+    # decoded rgb24 frame -> h x w x 3 uint8 (rows may be padded)
+    w, h = img.get_size()
+    stride = img.get_linesizes()[0]
+    data = np.frombuffer(img.to_memoryview()[0], np.uint8)
+    return data[:h * stride].reshape(h, stride)[:, :w * 3].reshape(h, w, 3)
+
+
+def frame_features(arr):
+    # 16-bin histogram per channel (normalized) and a grey image
+    bins = (arr >> 4).reshape(-1, 3) + np.array([0, 16, 32], np.uint8)
+    hist = np.bincount(bins.ravel(), minlength=48) / (arr.shape[0] * arr.shape[1])
+    grey = arr.mean(axis=2, dtype=np.float32)
+    return hist, grey
+
+
+def frame_distance(a, b):
+    """Histogram distance and mean pixel difference of two frames' features,
+    both in 0..1."""
+    hist_diff = np.abs(a[0] - b[0]).sum() / 6
+    if a[1].shape != b[1].shape:
+        return hist_diff, 1.0
+    pixel_diff = np.abs(a[1] - b[1]).mean() / 255
+    return hist_diff, pixel_diff
+
+
+def scan_segment(args):
+    """Decode [start, end) of a video and measure each frame against the
+    previous one. Returns the timestamps, the two distances per frame (the
+    first frame has none) and the first/last frame features, used to join
+    the segments."""
+    video_path, start, end, width = args
+    player, meta = open_player(video_path, width)
+    frame_dt = 0.04
+    num, den = meta.get("frame_rate") or (25, 1)
+    if num:
+        frame_dt = den / num
+    half = frame_dt / 2
+
+    pts_list, hist_diffs, pixel_diffs = [], [], []
+    first = prev = None
+    try:
+        if start > 0:
+            player.seek(start, relative=False, accurate=False)
+
+        t0 = time.time()
+        while True:
+            frame, val = player.get_frame()
+            if frame == "eof" or val == "eof":
+                break
+            if frame is None:
+                # nothing decoded for a long time: broken stream
+                if time.time() - t0 > 10.0:
+                    break
+                time.sleep(0.001)
+                continue
+            t0 = time.time()
+
+            img, pts = frame
+            if pts < start - half:
+                # keyframe before the segment start
+                continue
+            if end is not None and pts >= end - half:
+                break
+
+            feats = frame_features(frame_array(img))
+            if prev is None:
+                first = feats
+                hist_diffs.append(0.0)
+                pixel_diffs.append(0.0)
+            else:
+                h, p = frame_distance(prev, feats)
+                hist_diffs.append(h)
+                pixel_diffs.append(p)
+            pts_list.append(pts)
+            prev = feats
+    finally:
+        player.close_player()
+
+    return pts_list, hist_diffs, pixel_diffs, first, prev
+
+
+# -----------------------------------------------------------
+# Cut detection
+# -----------------------------------------------------------
+def find_cuts(pts, scores, threshold=0.3, ratio=3.0, window=15, min_shot=1.0):
+    """Timestamps where a new shot starts: the frame's score is above the
+    threshold and well above the scores around it (which keeps fast motion
+    from being taken as cuts)."""
+    pts = np.asarray(pts)
+    scores = np.asarray(scores, dtype=np.float64)
+    if len(scores) < 2:
+        return []
+
+    padded = np.pad(scores, window, mode="edge")
+    local = np.median(np.lib.stride_tricks.sliding_window_view(padded, 2 * window + 1), axis=1)
+    candidates = np.nonzero((scores >= threshold) & (scores >= ratio * local))[0]
+
+    cuts = []
+    last = pts[0]
+    for i in candidates:
+        if pts[i] - last >= min_shot:
+            cuts.append(float(pts[i]))
+            last = pts[i]
+    return cuts
+
+
+def detect_shots(video_path, workers=None, segments=None, width=DETECT_WIDTH,
+                 threshold=0.3, ratio=3.0, min_shot=1.0):
+    """Shot intervals [(start, end), ...] of a video. The video is split
+    into time segments that are decoded in parallel."""
+    player, meta = open_player(video_path, width)
+    duration = meta["duration"]
+    player.close_player()
+
+    workers = workers or os.cpu_count() or 1
+    if segments is None:
+        # a few segments per worker for load balancing, but none shorter
+        # than 30 s, which would not pay for the player start-up
+        segments = max(1, min(workers * 4, int(duration // 30)))
+    bounds = [duration * i / segments for i in range(segments + 1)]
+    jobs = [(video_path, bounds[i], bounds[i + 1] if i + 1 < segments else None, width)
+            for i in range(segments)]
+
+    if workers == 1 or segments == 1:
+        # no pool, e.g. when already running inside a batch worker process
+        results = [scan_segment(job) for job in jobs]
+    else:
+        with Pool(min(workers, segments)) as pool:
+            results = pool.map(scan_segment, jobs)
+
+    pts, hist_diffs, pixel_diffs = [], [], []
+    prev = None
+    for seg_pts, seg_hist, seg_pixel, first, last in results:
+        if not seg_pts:
+            continue
+        if prev is not None and first is not None:
+            # the first frame of a segment against the last of the previous
+            seg_hist[0], seg_pixel[0] = frame_distance(prev, first)
+        pts.extend(seg_pts)
+        hist_diffs.extend(seg_hist)
+        pixel_diffs.extend(seg_pixel)
+        prev = last
+
+    if not pts:
+        return []
+
+    scores = np.asarray(hist_diffs) + np.asarray(pixel_diffs)
+    cuts = find_cuts(pts, scores, threshold, ratio, min_shot=min_shot)
+
+    if cuts and duration - cuts[-1] < min_shot:
+        cuts.pop()
+    edges = [0.0] + cuts + [duration]
+    return list(zip(edges, edges[1:]))
+
+
+def write_intervals(path, intervals):
+    # same start,end layout as output.csv/film.csv/game.csv
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["start", "end"])
+        for start, end in intervals:
+            writer.writerow([format_time(start), format_time(end)])
+
+
+if __name__ == "__main__":
+    # python ShotDetector.py [video -o out.csv]  (default: control_* -> film.csv, reference_* -> game.csv)
+    parser = argparse.ArgumentParser(description="Find shot boundaries and write start,end interval CSVs.")
+    parser.add_argument("video", nargs="?", help="video file (default: control_*/reference_* here)")
+    parser.add_argument("-o", "--output", help="CSV to write (with a video argument)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--threshold", type=float, default=0.3, help="minimum frame change for a cut, 0..2")
+    parser.add_argument("--min-shot", type=float, default=1.0, help="shortest shot in seconds")
+    parser.add_argument("--width", type=int, default=DETECT_WIDTH, help="decode width in pixels")
+    parser.add_argument("-f", "--force", action="store_true", help="overwrite existing CSV files")
+    args = parser.parse_args()
+
+    if args.video:
+        jobs = [(args.video, args.output or os.path.splitext(args.video)[0] + ".csv")]
+    else:
+        jobs = []
+        for prefix, csv_path in OUTPUTS:
+            video = first_video(".", prefix)
+            if video:
+                jobs.append((os.path.normpath(video), csv_path))
+
+    for video, csv_path in jobs:
+        if os.path.exists(csv_path) and not args.force:
+            # hand-made intervals are not overwritten by accident
+            print(f"skipped: {csv_path} exists (use --force)")
+            continue
+
+        t0 = time.time()
+        intervals = detect_shots(video, args.workers, width=args.width,
+                                 threshold=args.threshold, min_shot=args.min_shot)
+        write_intervals(csv_path, intervals)
+        print(f"{video} -> {csv_path}: {len(intervals)} intervals, {time.time() - t0:.1f}s")
@@ -0,0 +1,211 @@
+from ffpyplayer.player import MediaPlayer
+from ProjectStore import read_interval_csv, first_video
+from KeyframeIndex import KeyframeIndex, seek_frame
+from ShotDetector import frame_array
+import numpy as np
+import time
+import os
+
+# where frames are sampled inside an interval (fraction of its length)
+HASH_POINTS = (0.25, 0.5, 0.75)
+
+# number of game candidates shown for a film interval
+TOP_K = 5
+
+# candidates farther than this are left out; unrelated frames differ in
+# about 28 of the 64 bits after taking the closest of HASH_POINTS frames
+MAX_DISTANCE = 22.0
+
+# distance of rows without hashes, above any real 64-bit distance
+NO_HASH = 65.0
+
+
+def dct_matrix(n):
+    # orthonormal DCT-II basis, dct(x) = M @ x
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    m = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    m[0] /= np.sqrt(2.0)
+    return m
+
+
+DCT32 = dct_matrix(32)
+
+
+def phash(grey):
+    """64-bit perceptual hash of a 32x32 grey image: the signs of the 8x8
+    lowest DCT frequencies against their median."""
+    coeffs = DCT32 @ grey @ DCT32.T
+    low = coeffs[:8, :8].ravel()
+    bits = low > np.median(low[1:])     # DC left out of the median
+    return np.packbits(bits).view(">u8")[0].astype(np.uint64)
+
+
+def frame_hash(img):
+    arr = frame_array(img).astype(np.float32)
+    grey = arr @ np.array([0.299, 0.587, 0.114], np.float32)
+    # nearest-neighbour resample to 32x32 (frames come in already small)
+    h, w = grey.shape
+    rows = (np.arange(32) * h) // 32
+    cols = (np.arange(32) * w) // 32
+    return phash(grey[rows][:, cols])
+
+
+if hasattr(np, "bitwise_count"):
+    def popcount(x):
+        return np.bitwise_count(x)
+else:
+    _BITS = np.array([bin(i).count("1") for i in range(256)], np.uint8)
+
+    def popcount(x):
+        # per-byte lookup for NumPy < 2.0
+        return _BITS[x.view(np.uint8)].reshape(x.shape + (8,)).sum(axis=-1)
+
+
+# -----------------------------------------------------------
+# Hash Index
+# -----------------------------------------------------------
+class HashIndex:
+    """Perceptual hashes of the intervals of one video as a packed
+    (intervals x HASH_POINTS) uint64 matrix, kept in a '<video>.phash'
+    sidecar. A query is a handful of vectorized XOR/popcount passes over
+    the matrix."""
+    def __init__(self, bounds, hashes, valid):
+        self.bounds = [(float(s), float(e)) for s, e in bounds]
+        self.hashes = np.asarray(hashes, np.uint64).reshape(len(self.bounds), len(HASH_POINTS))
+        self.valid = np.asarray(valid, bool)
+
+    def __len__(self):
+        return len(self.bounds)
+
+    @staticmethod
+    def sidecar(video_path):
+        return video_path + ".phash"
+
+    @classmethod
+    def load(cls, video_path):
+        # None when missing or made for another version of the video
+        path = cls.sidecar(video_path)
+        if not os.path.exists(path):
+            return None
+        try:
+            st = os.stat(video_path)
+            with np.load(path) as data:
+                if tuple(data["stat"]) != (st.st_mtime_ns, st.st_size):
+                    return None
+                return cls(data["bounds"], data["hashes"], data["valid"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, video_path):
+        st = os.stat(video_path)
+        path = self.sidecar(video_path)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                stat=np.array([st.st_mtime_ns, st.st_size], np.int64),
+                bounds=np.array(self.bounds, np.float64).reshape(-1, 2),
+                hashes=self.hashes,
+                valid=self.valid
+            )
+        os.replace(tmp_path, path)
+
+    def aligned(self, bounds):
+        """Rows rearranged to the given interval bounds, intervals without
+        hashes are marked invalid."""
+        rows = {}
+        for i, b in enumerate(self.bounds):
+            if self.valid[i]:
+                rows.setdefault(b, i)
+
+        bounds = [(float(s), float(e)) for s, e in bounds]
+        idx = np.array([rows.get(b, -1) for b in bounds], np.int64)
+        hashes = np.zeros((len(bounds), len(HASH_POINTS)), np.uint64)
+        found = idx >= 0
+        hashes[found] = self.hashes[idx[found]]
+        return HashIndex(bounds, hashes, found)
+
+    def distances(self, query):
+        """Distance of every row to a row of hashes (from another index):
+        for each query frame the closest frame of the row, averaged."""
+        query = np.asarray(query, np.uint64)
+        xor = self.hashes[:, None, :] ^ query[None, :, None]
+        dist = popcount(xor).min(axis=2).mean(axis=1)
+        dist[~self.valid] = NO_HASH
+        return dist
+
+    def top(self, query, k=TOP_K, max_distance=MAX_DISTANCE):
+        # indexes of the k closest rows (up to max_distance), closest first
+        dist = self.distances(query)
+        k = min(k, len(dist))
+        if k <= 0:
+            return []
+        best = np.argpartition(dist, k - 1)[:k]
+        best = best[np.argsort(dist[best], kind="stable")]
+        limit = NO_HASH if max_distance is None else max_distance
+        return [int(i) for i in best if dist[i] < limit]
+
+
+def build_hashes(video_path, intervals, stop=None, timeout=3.0):
+    """Hash index of a video's intervals, reusing the rows of an existing
+    sidecar whose bounds did not change. Frames are found through the
+    keyframe index, so the sampled frames are exact."""
+    bounds = [(float(s), float(e)) for s, e in intervals]
+    old = HashIndex.load(video_path)
+    index = old.aligned(bounds) if old else HashIndex(bounds, np.zeros((len(bounds), len(HASH_POINTS))), np.zeros(len(bounds), bool))
+    todo = [i for i in range(len(index)) if not index.valid[i]]
+    if not todo:
+        return index
+
+    keyframes = KeyframeIndex(video_path)
+    if not keyframes.times:
+        keyframes.scan(stop=stop)
+
+    player = MediaPlayer(
+        video_path.encode('utf-8'),
+        ff_opts={'paused': 1, 'an': 1, 'sync': 'video', 'out_fmt': 'rgb24'},
+        loglevel="quiet"
+    )
+    try:
+        t0 = time.time()
+        while not (player.get_metadata().get("src_vid_size") or (0, 0))[0]:
+            if time.time() - t0 > timeout:
+                return index
+            time.sleep(0.005)
+        player.set_size(32, -1)
+
+        for i in todo:
+            if stop is not None and stop.is_set():
+                break
+            start, end = bounds[i]
+            row = []
+            for p in HASH_POINTS:
+                found = seek_frame(player, keyframes, start + (end - start) * p, timeout=timeout)
+                if found is None:
+                    break
+                row.append(frame_hash(found[0]))
+            if len(row) == len(HASH_POINTS):
+                index.hashes[i] = row
+                index.valid[i] = True
+    finally:
+        player.close_player()
+
+    index.save(video_path)
+    return index
+
+
+if __name__ == "__main__":
+    # python SimilarityIndex.py  -> hashes for film.csv/control_* and game.csv/reference_*
+    jobs = [("film.csv", "control_"), ("game.csv", "reference_")]
+
+    for csv_path, prefix in jobs:
+        video = first_video(".", prefix)
+        if not video or not os.path.exists(csv_path):
+            print("skipped:", csv_path)
+            continue
+
+        video = os.path.normpath(video)
+        t0 = time.time()
+        index = build_hashes(video, read_interval_csv(csv_path))
+        print(f"{video}: {int(index.valid.sum())}/{len(index)} intervals hashed, {time.time() - t0:.1f}s")
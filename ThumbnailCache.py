@@ -0,0 +1,234 @@
+import pygame
+from ffpyplayer.player import MediaPlayer
+from ProjectStore import read_interval_csv, first_video
+from collections import OrderedDict
+import struct
+import mmap
+import time
+import os
+
+# size of one thumbnail as drawn in the interval lists
+THUMB_SIZE = (44, 24)
+
+# thumbnail surfaces kept decoded, a few screens of list rows
+MAX_SURFACES = 256
+
+# file layout: header, one entry per interval, then the RGB pixel blocks
+MAGIC = b"VSMTHMB1"
+HEADER = struct.Struct("<8sqqHHI")   # magic, video mtime_ns, video size, thumb w, thumb h, count
+ENTRY = struct.Struct("<ddB")        # interval start, end, filled flag
+
+
+# -----------------------------------------------------------
+# Thumbnail Cache
+# -----------------------------------------------------------
+class ThumbnailCache:
+    """One representative frame per interval, stored in a memory-mapped
+    '<video>.thumbs' file beside the video. The file is rebuilt when the
+    video's mtime/size changes; entries whose interval bounds changed are
+    decoded again, the others are carried over."""
+    def __init__(self, video_path, intervals, size=THUMB_SIZE, max_surfaces=MAX_SURFACES):
+        self.video_path = video_path
+        self.path = video_path + ".thumbs"
+        self.intervals = [(float(s), float(e)) for s, e in intervals]
+        self.size = size
+        self.block = size[0] * size[1] * 3
+        self.version = 0        # bumped on every new thumbnail
+        self._surfaces = OrderedDict()   # LRU of surfaces by interval index
+        self.max_surfaces = max_surfaces
+        self._file = None
+        self.mm = None
+        self.open()
+
+    def _offsets(self, count):
+        data_start = HEADER.size + count * ENTRY.size
+        return data_start, data_start + count * self.block
+
+    def _read_existing(self, stat):
+        # interval bounds in file order and (start, end) -> pixels of a
+        # cache file that still belongs to this video
+        if not os.path.exists(self.path):
+            return None, {}
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+            magic, mtime, vsize, w, h, count = HEADER.unpack_from(data, 0)
+        except (OSError, struct.error):
+            return None, {}
+
+        if (magic != MAGIC or mtime != stat.st_mtime_ns or vsize != stat.st_size
+                or (w, h) != self.size):
+            return None, {}
+
+        data_start, total = self._offsets(count)
+        if len(data) != total:
+            return None, {}
+
+        bounds, blocks = [], {}
+        for i in range(count):
+            start, end, filled = ENTRY.unpack_from(data, HEADER.size + i * ENTRY.size)
+            bounds.append((start, end))
+            if filled:
+                offset = data_start + i * self.block
+                blocks[(start, end)] = data[offset:offset + self.block]
+        return bounds, blocks
+
+    def open(self):
+        stat = os.stat(self.video_path)
+        bounds, old = self._read_existing(stat)
+
+        count = len(self.intervals)
+        data_start, total = self._offsets(count)
+
+        # same video and same intervals in the same order: just map it
+        if bounds != self.intervals:
+            buf = bytearray(total)
+            HEADER.pack_into(buf, 0, MAGIC, stat.st_mtime_ns, stat.st_size, self.size[0], self.size[1], count)
+            for i, iv in enumerate(self.intervals):
+                pixels = old.get(iv)
+                ENTRY.pack_into(buf, HEADER.size + i * ENTRY.size, iv[0], iv[1], 1 if pixels else 0)
+                if pixels:
+                    offset = data_start + i * self.block
+                    buf[offset:offset + self.block] = pixels
+
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(buf)
+            os.replace(tmp_path, self.path)
+
+        self._file = open(self.path, "r+b")
+        if total:
+            self.mm = mmap.mmap(self._file.fileno(), total)
+        self._data_start = data_start
+
+    def close(self):
+        if self.mm is not None:
+            self.mm.flush()
+            self.mm.close()
+            self.mm = None
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def filled(self, i):
+        return self.mm is not None and self.mm[HEADER.size + i * ENTRY.size + 16] == 1
+
+    def missing(self):
+        return [i for i in range(len(self.intervals)) if not self.filled(i)]
+
+    def get(self, i):
+        if not self.filled(i):
+            return None
+        offset = self._data_start + i * self.block
+        return self.mm[offset:offset + self.block]
+
+    def put(self, i, pixels):
+        offset = self._data_start + i * self.block
+        self.mm[offset:offset + self.block] = pixels
+        # flag last, a reader never sees half a thumbnail
+        self.mm[HEADER.size + i * ENTRY.size + 16] = 1
+        self.version += 1
+
+    def surface(self, i):
+        # pygame surface of thumbnail i, None until it was decoded
+        surf = self._surfaces.get(i)
+        if surf is not None:
+            self._surfaces.move_to_end(i)
+            return surf
+
+        pixels = self.get(i)
+        if pixels is None:
+            return None
+        surf = pygame.image.frombuffer(pixels, self.size, "RGB")
+        self._surfaces[i] = surf
+        if len(self._surfaces) > self.max_surfaces:
+            self._surfaces.popitem(last=False)   # least recently used
+        return surf
+
+
+def fit_into(img, size):
+    # letterbox a decoded frame into the thumbnail box
+    w, h = img.get_size()
+    surf = pygame.image.frombuffer(img.to_bytearray()[0], (w, h), "RGB")
+
+    tw, th = size
+    scale = min(tw / w, th / h)
+    new_w, new_h = max(1, int(w * scale)), max(1, int(h * scale))
+    if (new_w, new_h) != (w, h):
+        surf = pygame.transform.smoothscale(surf, (new_w, new_h))
+
+    box = pygame.Surface(size)
+    box.blit(surf, ((tw - new_w) // 2, (th - new_h) // 2))
+    return pygame.image.tobytes(box, "RGB")
+
+
+def build_thumbnails(cache, stop=None, pause=0.0, timeout=3.0):
+    """Decode the missing thumbnails of a cache: one seek to the middle of
+    each interval. stop is an optional threading.Event, pause is a sleep
+    between seeks so a running UI keeps its CPU share."""
+    todo = cache.missing()
+    if not todo:
+        return 0
+
+    player = MediaPlayer(
+        cache.video_path.encode('utf-8'),
+        ff_opts={'an': 1, 'sync': 'video', 'out_fmt': 'rgb24'},
+        loglevel="quiet"
+    )
+    done = 0
+    try:
+        # wait for the stream so ffmpeg can scale close to the thumbnail size
+        t0 = time.time()
+        while not (player.get_metadata().get("src_vid_size") or (0, 0))[0]:
+            if time.time() - t0 > timeout:
+                return 0
+            time.sleep(0.005)
+        player.set_size(cache.size[0], -1)
+
+        for i in todo:
+            if stop is not None and stop.is_set():
+                break
+
+            start, end = cache.intervals[i]
+            target = (start + end) / 2
+            player.seek(target, relative=False, accurate=True)
+
+            t0 = time.time()
+            while time.time() - t0 < timeout:
+                frame, val = player.get_frame()
+                if frame == "eof" or val == "eof":
+                    break
+                if frame is not None:
+                    img, pts = frame
+                    # frames decoded before the seek are skipped
+                    if abs(pts - target) <= 1.0:
+                        cache.put(i, fit_into(img, cache.size))
+                        done += 1
+                        break
+                time.sleep(0.005)
+
+            if pause:
+                time.sleep(pause)
+    finally:
+        player.close_player()
+        if cache.mm is not None:
+            cache.mm.flush()
+    return done
+
+
+if __name__ == "__main__":
+    # python ThumbnailCache.py  -> film.csv/control_* and game.csv/reference_*
+    jobs = [("film.csv", "control_"), ("game.csv", "reference_")]
+
+    for csv_path, prefix in jobs:
+        video = first_video(".", prefix)
+        if not video or not os.path.exists(csv_path):
+            print("skipped:", csv_path)
+            continue
+
+        video = os.path.normpath(video)
+        cache = ThumbnailCache(video, read_interval_csv(csv_path))
+        t0 = time.time()
+        done = build_thumbnails(cache)
+        print(f"{video}: {done} new thumbnails, {len(cache.missing())} missing, {time.time() - t0:.1f}s")
+        cache.close()
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from AudioFingerprint import HOP, MAX_HITS, SAMPLE_RATE, AudioFingerprints, match_interval
+
+FRAMES_PER_SECOND = SAMPLE_RATE / HOP
+
+
+def fingerprints(pairs):
+    # (hash, frame) pairs, sorted by frame like a real fingerprint
+    pairs = sorted(pairs, key=lambda p: p[1])
+    return AudioFingerprints([h for h, _ in pairs], [t for _, t in pairs])
+
+
+# film interval (0, 10): 20 hashes between 0.3 s and 6.4 s, and one after it
+FILM = fingerprints([(100 + i, 10 + 10 * i) for i in range(20)] + [(999, 400)])
+FILM_BOUNDS = (0.0, 10.0)
+GAME_BOUNDS = [(0.0, 20.0), (30.0, 40.0)]
+
+
+def shifted(hashes, frames):
+    # the film's hashes, `frames` later
+    return [(100 + i, 10 + 10 * i + frames) for i in hashes]
+
+
+def test_offset_voting():
+    # all 20 hashes 32 s later: the film start is 2 s into game interval 1,
+    # and 12 of them 6.4 s later (game interval 0), plus noise hits
+    game = fingerprints(shifted(range(20), 1000) + shifted(range(12), 200) + [(105, 700), (107, 20)])
+
+    result = match_interval(FILM, FILM_BOUNDS, game, GAME_BOUNDS)
+    assert [(g, votes) for g, votes, _ in result] == [(1, 20), (0, 12)]
+    assert result[0][2] == pytest.approx(2.0)
+    assert result[1][2] == pytest.approx(200 / FRAMES_PER_SECOND)
+
+
+def test_min_votes_and_k():
+    game = fingerprints(shifted(range(20), 1000) + shifted(range(12), 200))
+
+    assert [g for g, _, _ in match_interval(FILM, FILM_BOUNDS, game, GAME_BOUNDS, min_votes=15)] == [1]
+    assert [g for g, _, _ in match_interval(FILM, FILM_BOUNDS, game, GAME_BOUNDS, k=1)] == [1]
+    assert match_interval(FILM, FILM_BOUNDS, game, GAME_BOUNDS, min_votes=21) == []
+
+
+def test_hits_outside_intervals_do_not_vote():
+    # 20 s..30 s lies between the game intervals
+    game = fingerprints(shifted(range(20), int(22 * FRAMES_PER_SECOND)))
+
+    assert match_interval(FILM, FILM_BOUNDS, game, GAME_BOUNDS, min_votes=1) == []
+
+
+def test_common_hashes_are_skipped():
+    game = fingerprints([(100, t) for t in range(1000, 1000 + MAX_HITS + 1)])
+    query, frames = game.lookup(np.array([100], np.uint32))
+
+    assert len(query) == 0 and len(frames) == 0
+
+
+def test_no_hashes():
+    empty = fingerprints([])
+
+    assert match_interval(empty, FILM_BOUNDS, FILM, GAME_BOUNDS) == []
+    assert match_interval(FILM, FILM_BOUNDS, empty, GAME_BOUNDS) == []
+    assert match_interval(FILM, FILM_BOUNDS, FILM, []) == []
@@ -0,0 +1,46 @@
+from IntervalMatchingApp import MatchIndex
+
+
+def test_add_is_idempotent():
+    index = MatchIndex()
+    assert index.add(1, 10)
+    assert not index.add(1, 10)
+    assert len(index) == 1
+    assert index.has(1, 10)
+
+
+def test_both_directions():
+    index = MatchIndex()
+    index.add(1, 10)
+    index.add(1, 11)
+    index.add(2, 10)
+
+    assert index.games_of(1) == {10, 11}
+    assert index.films_of(10) == {1, 2}
+    assert index.film_degree(1) == 2
+    assert index.game_degree(10) == 2
+    assert len(index) == 3
+
+
+def test_remove():
+    index = MatchIndex()
+    index.add(1, 10)
+    index.add(2, 10)
+
+    assert index.remove(1, 10)
+    assert not index.remove(1, 10)
+    assert not index.has(1, 10)
+    assert index.films_of(10) == {2}
+    assert index.film_degree(1) == 0
+    assert index.game_degree(10) == 1
+    assert len(index) == 1
+
+
+def test_unknown_ids():
+    index = MatchIndex()
+    assert not index.has(5, 50)
+    assert not index.remove(5, 50)
+    assert index.games_of(5) == frozenset()
+    assert index.films_of(50) == frozenset()
+    assert index.film_degree(5) == 0
+    assert len(index) == 0
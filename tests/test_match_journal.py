@@ -0,0 +1,105 @@
+import csv
+import os
+
+from IntervalMatchingApp import MatchJournal, JOURNAL_COMPACT_RECORDS
+
+A = ("00:00:01", "00:00:03", "00:00:05", "00:00:09")
+B = ("00:00:10", "00:00:12", "00:00:20", "00:00:25")
+C = ("00:01:00", "00:01:05", "00:02:00", "00:02:05")
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(MatchJournal.FIELDS)
+        writer.writerows(rows)
+
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return [tuple(row) for row in csv.reader(f)][1:]
+
+
+def test_load_replays_journal_on_csv(tmp_path):
+    path = str(tmp_path / "matches.csv")
+    write_csv(path, [A, B])
+    journal = MatchJournal(path)
+    journal.remove(A)
+    journal.add(C)
+    journal.add(A)
+    journal.close()
+
+    assert MatchJournal(path).load() == [B, C, A]
+
+
+def test_load_without_files(tmp_path):
+    journal = MatchJournal(str(tmp_path / "matches.csv"))
+    assert journal.load() == []
+    assert journal.records == 0
+
+
+def test_load_ignores_line_cut_by_crash(tmp_path):
+    path = str(tmp_path / "matches.csv")
+    write_csv(path, [A])
+    with open(path + ".journal", "w", newline="", encoding="utf-8") as f:
+        f.write("+," + ",".join(B) + "\r\n")
+        f.write("-," + ",".join(A)[:10])      # no newline: cut short
+
+    journal = MatchJournal(path)
+    assert journal.load() == [A, B]
+    assert journal.records == 1
+
+
+def test_append_after_crash_starts_a_new_line(tmp_path):
+    path = str(tmp_path / "matches.csv")
+    with open(path + ".journal", "w", newline="", encoding="utf-8") as f:
+        f.write("+," + ",".join(A)[:10])
+    journal = MatchJournal(path)
+    journal.add(B)
+    journal.close()
+
+    assert MatchJournal(path).load() == [B]
+
+
+def test_sources_point_at_file_lines(tmp_path):
+    path = str(tmp_path / "matches.csv")
+    write_csv(path, [A, A, B])
+    journal = MatchJournal(path)
+    journal.remove(B)
+    journal.add(C)
+    journal.close()
+
+    journal = MatchJournal(path)
+    journal.load()
+    assert journal.sources == {A: (path, 2), C: (path + ".journal", 2)}
+
+
+def test_compact_folds_journal_into_csv(tmp_path):
+    path = str(tmp_path / "matches.csv")
+    write_csv(path, [A, B])
+    journal = MatchJournal(path)
+    journal.remove(A)
+    journal.add(C)
+
+    journal.compact()
+
+    assert read_csv(path) == [B, C]
+    assert not os.path.exists(journal.journal_path)
+    assert journal.records == 0
+    assert MatchJournal(path).load() == [B, C]
+
+
+def test_compact_without_journal_keeps_csv(tmp_path):
+    path = str(tmp_path / "matches.csv")
+    write_csv(path, [A])
+    MatchJournal(path).compact()
+    assert read_csv(path) == [A]
+
+
+def test_outgrown():
+    journal = MatchJournal("matches.csv")
+    journal.records = JOURNAL_COMPACT_RECORDS
+    assert not journal.outgrown(0)
+    journal.records = JOURNAL_COMPACT_RECORDS + 1
+    assert journal.outgrown(0)
+    assert not journal.outgrown(JOURNAL_COMPACT_RECORDS)
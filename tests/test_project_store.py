@@ -0,0 +1,90 @@
+import csv
+
+import pytest
+
+from ProjectStore import ProjectStore
+
+
+def write_intervals(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["start", "end"])
+        writer.writerows(rows)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ProjectStore(str(tmp_path / "project.sqlite"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def matched(store, tmp_path):
+    # one film/game interval pair matched on top of two imported sides
+    film_csv = str(tmp_path / "film.csv")
+    game_csv = str(tmp_path / "game.csv")
+    write_intervals(film_csv, [("00:00:01", "00:00:03"), ("00:00:05", "00:00:09")])
+    write_intervals(game_csv, [("00:00:02", "00:00:04")])
+    store.import_csv("p", "film", film_csv)
+    store.import_csv("p", "game", game_csv)
+    film = store.load_intervals("p", "film")
+    game = store.load_intervals("p", "game")
+    store.add_match(film[0]["db_id"], game[0]["db_id"])
+    return film_csv, film, game
+
+
+def test_import_adds_intervals(store, tmp_path):
+    path = str(tmp_path / "film.csv")
+    write_intervals(path, [("00:00:05", "00:00:09"), ("00:00:01", "00:00:03")])
+
+    assert store.import_csv("p", "film", path) == (2, 0)
+    assert [(it["start"], it["end"]) for it in store.load_intervals("p", "film")] == [(1, 3), (5, 9)]
+
+
+def test_reimport_keeps_ids_and_matches(store, matched):
+    film_csv, film, game = matched
+
+    assert store.import_csv("p", "film", film_csv) == (0, 0)
+    assert store.load_intervals("p", "film") == film
+    assert store.load_matches("p") == [(film[0]["db_id"], game[0]["db_id"])]
+
+
+def test_reimport_adds_and_removes_unmatched(store, matched):
+    film_csv, film, game = matched
+    write_intervals(film_csv, [("00:00:01", "00:00:03"), ("00:00:10", "00:00:12")])
+
+    assert store.import_csv("p", "film", film_csv) == (1, 1)
+    bounds = [(it["start"], it["end"]) for it in store.load_intervals("p", "film")]
+    assert bounds == [(1, 3), (10, 12)]
+    assert store.load_matches("p") == [(film[0]["db_id"], game[0]["db_id"])]
+
+
+def test_removing_matched_interval_is_refused(store, matched):
+    film_csv, film, game = matched
+    write_intervals(film_csv, [("00:00:05", "00:00:09")])
+
+    with pytest.raises(ValueError, match="1 matches"):
+        store.import_csv("p", "film", film_csv)
+    assert store.load_intervals("p", "film") == film
+    assert len(store.load_matches("p")) == 1
+
+
+def test_force_drops_matched_interval(store, matched):
+    film_csv, film, game = matched
+    write_intervals(film_csv, [("00:00:05", "00:00:09")])
+
+    assert store.import_csv("p", "film", film_csv, force=True) == (0, 1)
+    assert store.load_intervals("p", "film") == film[1:]
+    assert store.load_matches("p") == []
+
+
+def test_duplicate_rows_keep_one_id_each(store, tmp_path):
+    path = str(tmp_path / "film.csv")
+    write_intervals(path, [("00:00:01", "00:00:03"), ("00:00:01", "00:00:03")])
+    store.import_csv("p", "film", path)
+    before = store.load_intervals("p", "film")
+
+    assert store.import_csv("p", "film", path) == (0, 0)
+    assert store.load_intervals("p", "film") == before
+    assert len(before) == 2
@@ -0,0 +1,43 @@
+from ShotDetector import find_cuts
+
+
+def frames(count, fps=25.0):
+    return [i / fps for i in range(count)]
+
+
+def test_spikes_are_cuts():
+    scores = [0.02] * 200
+    scores[50] = 0.8
+    scores[120] = 0.6
+
+    assert find_cuts(frames(200), scores) == [2.0, 4.8]
+
+
+def test_fast_motion_is_not_a_cut():
+    # every frame differs a lot, nothing stands out from its neighbours
+    scores = [0.5] * 200
+    scores[100] = 0.6
+
+    assert find_cuts(frames(200), scores) == []
+
+
+def test_low_spike_is_not_a_cut():
+    scores = [0.01] * 100
+    scores[50] = 0.2
+
+    assert find_cuts(frames(100), scores) == []
+
+
+def test_min_shot():
+    scores = [0.02] * 200
+    scores[10] = 0.8  # 0.4 s after the start
+    scores[50] = 0.8
+    scores[60] = 0.8  # 0.4 s after the previous cut
+
+    assert find_cuts(frames(200), scores) == [2.0]
+    assert find_cuts(frames(200), scores, min_shot=0.2) == [0.4, 2.0, 2.4]
+
+
+def test_too_few_frames():
+    assert find_cuts([], []) == []
+    assert find_cuts([0.0], [0.9]) == []
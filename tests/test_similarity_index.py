@@ -0,0 +1,47 @@
+import numpy as np
+
+from SimilarityIndex import HASH_POINTS, HashIndex
+
+
+def row(bits):
+    # one interval whose sampled frames all hash to the lowest `bits` bits set
+    return [(1 << bits) - 1] * len(HASH_POINTS)
+
+
+def make_index(bits, valid=None):
+    bounds = [(i * 10.0, i * 10.0 + 5.0) for i in range(len(bits))]
+    hashes = [row(b) for b in bits]
+    return HashIndex(bounds, hashes, valid if valid is not None else [True] * len(bits))
+
+
+def test_aligned_reorders_rows():
+    index = make_index([1, 2, 3])
+
+    aligned = index.aligned([(20, 25), (0, 5), (40, 45)])
+    assert aligned.bounds == [(20.0, 25.0), (0.0, 5.0), (40.0, 45.0)]
+    assert aligned.valid.tolist() == [True, True, False]
+    assert aligned.hashes[0].tolist() == row(3)
+    assert aligned.hashes[1].tolist() == row(1)
+
+
+def test_aligned_drops_invalid_rows():
+    index = make_index([1, 2], valid=[True, False])
+
+    assert index.aligned([(0, 5), (10, 15)]).valid.tolist() == [True, False]
+
+
+def test_top_closest_first():
+    index = make_index([8, 0, 4, 30])
+    query = np.array(row(0), np.uint64)
+
+    assert index.top(query, k=3) == [1, 2, 0]
+    assert index.top(query, k=10) == [1, 2, 0]  # 30 bits is above MAX_DISTANCE
+    assert index.top(query, k=10, max_distance=None) == [1, 2, 0, 3]
+    assert index.top(query, k=2, max_distance=5) == [1, 2]
+
+
+def test_top_skips_invalid_rows():
+    index = make_index([0, 1, 2], valid=[False, True, True])
+
+    assert index.top(np.array(row(0), np.uint64), k=3) == [1, 2]
+    assert index.top(np.array(row(0), np.uint64), k=0) == []